@@ -1,4 +1,5 @@
 """Application configuration settings."""
+from functools import cached_property
 from typing import Optional
 from pydantic_settings import BaseSettings
 
@@ -27,12 +28,28 @@ class Settings(BaseSettings):
     reset_token_expire_minutes: int = 60  # 1 hour expiration
     reset_rate_limit_per_hour: int = 3  # Max reset requests per email per hour
 
+    # Email
+    email_concurrency: int = 10  # Max SMTP sends in flight for batch emails (daily summary)
+
+    # Scheduled Jobs
+    job_log_retention_days: int = 90  # scheduled_job_logs rows older than this are pruned daily
+    api_token_last_used_flush_seconds: int = 30  # how often buffered token last_used stamps are written
+    last_login_flush_seconds: int = 30  # how often buffered user last_login stamps are written
+
     # App Base URL (used for password reset links, invitation links)
     app_base_url: str = "http://localhost:3103"
 
     # CORS Origins (comma-separated list or "*")
     cors_origins: str = "http://localhost:3103"
 
+    @cached_property
+    def cors_origins_list(self) -> frozenset[str]:
+        """Allowed CORS origins, parsed once from the comma-separated setting.
+
+        A frozenset so CORSMiddleware's per-request origin check is a hash lookup.
+        """
+        return frozenset(o.strip() for o in self.cors_origins.split(",") if o.strip())
+
     class Config:
         env_file = ".env"
         env_file_encoding = "utf-8"
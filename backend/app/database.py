@@ -1,6 +1,9 @@
 """Database connection and session management."""
 import os
-from sqlalchemy import create_engine, text
+from contextlib import contextmanager
+
+import orjson
+from sqlalchemy import create_engine, event, func, select
 from sqlalchemy.orm import sessionmaker
 
 from .models import Base
@@ -12,14 +15,59 @@ os.makedirs(os.path.dirname(DATABASE_PATH) if os.path.dirname(DATABASE_PATH) els
 
 SQLALCHEMY_DATABASE_URL = f"sqlite:///{DATABASE_PATH}"
 
+def _json_serializer(value) -> str:
+    return orjson.dumps(value, option=orjson.OPT_NON_STR_KEYS).decode()
+
+
 engine = create_engine(
     SQLALCHEMY_DATABASE_URL,
-    connect_args={"check_same_thread": False}  # Needed for SQLite
+    connect_args={"check_same_thread": False},  # Needed for SQLite
+    # JSON columns (assigned_kids, chore_streaks, ...) go through orjson
+    json_serializer=_json_serializer,
+    json_deserializer=orjson.loads,
 )
 
+# Applied to every new SQLite connection. WAL lets request handlers keep
+# reading while a background job or token bookkeeping write is in flight,
+# and synchronous=NORMAL is durable in WAL mode with half the fsyncs.
+SQLITE_PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA busy_timeout=5000",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA cache_size=-64000",
+    "PRAGMA mmap_size=268435456",
+    "PRAGMA wal_autocheckpoint=1000",
+    # Bounded statistics refresh for long-lived pooled connections
+    "PRAGMA analysis_limit=400",
+    "PRAGMA optimize=0x10002",
+)
+
+
+@event.listens_for(engine, "connect")
+def _set_sqlite_pragmas(dbapi_connection, connection_record):
+    cursor = dbapi_connection.cursor()
+    for pragma in SQLITE_PRAGMAS:
+        cursor.execute(pragma)
+    cursor.close()
+
+
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 
+def json_contains(column, value):
+    """SQL predicate: the JSON array in ``column`` contains ``value``.
+
+    Lets queries on list columns such as assigned_kids filter in SQLite via
+    json_each instead of loading every row and scanning the list in Python.
+    """
+    items = func.json_each(column).table_valued("value")
+    return select(items.c.value).where(items.c.value == value).exists()
+
+
+_db_initialized = False
+
+
 def init_db():
     """Initialize database tables.
 
@@ -29,27 +77,85 @@ def init_db():
 
     Note: create_all() is safe - it only creates tables that don't exist.
     It won't modify existing tables or drop data.
+
+    Also ensures indexes. Runs once per process; later calls are no-ops.
     """
+    global _db_initialized
+    if _db_initialized:
+        return
     Base.metadata.create_all(bind=engine)
+    ensure_indexes()
+    _db_initialized = True
 
 
 def ensure_indexes():
     """Create indexes on existing tables (create_all only handles new tables)."""
-    indexes = [
-        "CREATE INDEX IF NOT EXISTS ix_chore_claims_status ON chore_claims (status)",
-        "CREATE INDEX IF NOT EXISTS ix_chore_claims_kid_id ON chore_claims (kid_id)",
-        "CREATE INDEX IF NOT EXISTS ix_chore_claims_chore_id ON chore_claims (chore_id)",
+    statements = [
+        # Status-only lookups use the (status, ...) composites below
+        "DROP INDEX IF EXISTS ix_chore_claims_status",
+        # Per-kid claim history by date; also serves kid_id-only lookups
+        "CREATE INDEX IF NOT EXISTS ix_chore_claims_kid_claimed_at ON chore_claims (kid_id, claimed_at)",
+        "DROP INDEX IF EXISTS ix_chore_claims_kid_id",
+        # Covers the streak job's approved-today scan without touching the table
+        "CREATE INDEX IF NOT EXISTS ix_chore_claims_status_claimed_at ON chore_claims (status, claimed_at, kid_id, chore_id)",
+        # Serves chore_id-only lookups too, so the single-column index is redundant
+        "CREATE INDEX IF NOT EXISTS ix_chore_claims_chore_status_claimed ON chore_claims (chore_id, status, claimed_at)",
+        "DROP INDEX IF EXISTS ix_chore_claims_chore_id",
         "CREATE INDEX IF NOT EXISTS ix_chore_claims_claimed_at ON chore_claims (claimed_at)",
-        "CREATE INDEX IF NOT EXISTS ix_reward_claims_status ON reward_claims (status)",
+        # Per-kid status counts and lookups (pending/claimed/approved)
+        "CREATE INDEX IF NOT EXISTS ix_chore_claims_kid_status_claimed ON chore_claims (kid_id, status, claimed_at)",
+        # Status-only lookups use the (status, approved_at, id) composite below
+        "DROP INDEX IF EXISTS ix_reward_claims_status",
         "CREATE INDEX IF NOT EXISTS ix_reward_claims_kid_id ON reward_claims (kid_id)",
-        "CREATE INDEX IF NOT EXISTS ix_allowance_payouts_kid_id ON allowance_payouts (kid_id)",
+        "CREATE INDEX IF NOT EXISTS ix_reward_claims_reward_status ON reward_claims (reward_id, status)",
+        # Covers the per-kid summary aggregate; also serves kid_id-only lookups
+        "CREATE INDEX IF NOT EXISTS ix_allowance_payouts_kid_status ON allowance_payouts (kid_id, status, dollar_amount)",
+        # Keyset pagination of payout and approval history (newest first)
+        "CREATE INDEX IF NOT EXISTS ix_allowance_payouts_kid_requested ON allowance_payouts (kid_id, requested_at, id)",
+        "CREATE INDEX IF NOT EXISTS ix_chore_claims_status_approved ON chore_claims (status, approved_at, id)",
+        "CREATE INDEX IF NOT EXISTS ix_reward_claims_status_approved ON reward_claims (status, approved_at, id)",
+        "DROP INDEX IF EXISTS ix_allowance_payouts_kid_id",
         "CREATE INDEX IF NOT EXISTS ix_allowance_payouts_status ON allowance_payouts (status)",
         "CREATE INDEX IF NOT EXISTS ix_push_subscriptions_kid_id ON push_subscriptions (kid_id)",
+        "CREATE INDEX IF NOT EXISTS ix_push_subscriptions_endpoint ON push_subscriptions (endpoint)",
+        "CREATE INDEX IF NOT EXISTS ix_password_reset_tokens_token_hash ON password_reset_tokens (token_hash)",
+        "CREATE INDEX IF NOT EXISTS ix_scheduled_job_logs_name_executed ON scheduled_job_logs (job_name, executed_at)",
+        "CREATE INDEX IF NOT EXISTS ix_api_tokens_token_prefix ON api_tokens (token_prefix)",
+        # Auth resolves a token by its hash alone, so it must name exactly one row
+        "DROP INDEX IF EXISTS ix_api_tokens_token_hash",
+        "CREATE UNIQUE INDEX IF NOT EXISTS ux_api_tokens_token_hash ON api_tokens (token_hash)",
+        "CREATE INDEX IF NOT EXISTS ix_daily_multipliers_kid_date ON daily_multipliers (kid_id, date)",
+        "CREATE INDEX IF NOT EXISTS ix_parents_user_id ON parents (user_id)",
+        "CREATE INDEX IF NOT EXISTS ix_kids_user_id ON kids (user_id)",
+        "CREATE INDEX IF NOT EXISTS ix_users_oauth_id ON users (oauth_id)",
+        # Pending payout queue in request order, without a sort; only the
+        # small pending slice is indexed
+        "CREATE INDEX IF NOT EXISTS ix_allowance_payouts_pending ON allowance_payouts (requested_at) WHERE status = 'pending'",
+        # Refresh planner statistics so new indexes get picked up; the
+        # connection's analysis_limit (SQLITE_PRAGMAS) keeps this cheap on
+        # large tables
+        "ANALYZE",
     ]
+    # One script, one transaction, one round-trip through the driver
+    script = ";\n".join(["BEGIN"] + statements + ["COMMIT"]) + ";"
+    with engine.begin() as conn:
+        conn.connection.executescript(script)
+
+
+def checkpoint_wal():
+    """Fold the WAL back into the main database file and truncate it.
+
+    Auto-checkpoints never shrink the -wal file; this keeps it small after
+    write-heavy jobs so readers don't have to scan a long log.
+    """
+    with engine.connect() as conn:
+        conn.exec_driver_sql("PRAGMA wal_checkpoint(TRUNCATE)")
+
+
+def optimize_db():
+    """Let SQLite refresh planner statistics that have gone stale."""
     with engine.connect() as conn:
-        for sql in indexes:
-            conn.execute(text(sql))
-        conn.commit()
+        conn.exec_driver_sql("PRAGMA optimize")
 
 
 def get_db():
@@ -61,10 +167,19 @@ def get_db():
         db.close()
 
 
-def get_db_session():
-    """Get a database session for background jobs."""
+@contextmanager
+def session_scope():
+    """Transactional session for background jobs.
+
+    Commits on success, rolls back on error and always closes, so the
+    connection goes back to the pool as soon as the block exits.
+    """
     db = SessionLocal()
     try:
         yield db
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
     finally:
         db.close()
@@ -1,18 +1,81 @@
 """FastAPI dependencies for authentication."""
-from datetime import datetime, timezone
 from typing import Optional
 
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, load_only, make_transient_to_detached
 
+from .cache import TTLCache
+from .config import settings
 from .database import get_db
 from .models import User, ApiToken
-from .security import decode_token, verify_api_token, get_token_prefix
+from .services.timestamp_flusher import last_used_flusher
+from .security import (
+    decode_token, verify_api_token, get_token_prefix, hash_api_token, is_legacy_api_token_hash
+)
 
 # Security scheme for JWT Bearer tokens
 bearer_scheme = HTTPBearer(auto_error=False)
 
+# Verified API tokens, keyed by token hash -> (token_id, user_id). Skips the
+# token lookup on repeat requests.
+_api_token_cache = TTLCache(maxsize=10_000, ttl=60)
+
+
+# Columns route handlers read from the authenticated user; password_hash,
+# oauth_id and the bookkeeping timestamps are never needed on this path.
+_AUTH_USER_COLUMNS = (
+    "id", "email", "display_name", "avatar_url",
+    "oauth_provider", "is_active", "is_admin", "created_at",
+)
+_AUTH_USER_OPTIONS = [load_only(*(getattr(User, name) for name in _AUTH_USER_COLUMNS))]
+
+# Those columns keyed by user id, so repeat requests skip the user SELECT.
+_user_cache = TTLCache(maxsize=10_000, ttl=60)
+
+
+def _load_user(db: Session, user_id: str) -> Optional[User]:
+    cached = _user_cache.get(user_id)
+    if cached is not None:
+        # Rebuild a clean instance and attach it to this session without a
+        # SELECT; columns outside the snapshot load on first access.
+        user = User(**cached)
+        make_transient_to_detached(user)
+        return db.merge(user, load=False)
+
+    user = db.get(User, user_id, options=_AUTH_USER_OPTIONS)
+    if user is not None:
+        _user_cache.set(user_id, {name: getattr(user, name) for name in _AUTH_USER_COLUMNS})
+    return user
+
+
+def invalidate_user(user_id: str) -> None:
+    """Forget the cached auth snapshot of a user (call after changing the row)."""
+    _user_cache.pop(user_id)
+
+
+def invalidate_api_token(token_id: str) -> None:
+    """Forget cached resolutions of a token (call after revoking it)."""
+    _api_token_cache.discard_if(lambda entry: entry[0] == token_id)
+
+
+def _upgrade_legacy_api_token(db: Session, token: str, token_hash: str) -> Optional[ApiToken]:
+    """Verify a token still stored with bcrypt and switch it to its SHA256 hash.
+
+    Only tokens sharing the display prefix are checked, so this costs at most a
+    bcrypt round or two, once per token.
+    """
+    candidates = db.query(ApiToken).filter(
+        ApiToken.token_prefix == get_token_prefix(token),
+        ApiToken.token_hash.like("$2%"),
+    ).all()
+    for api_token in candidates:
+        if is_legacy_api_token_hash(api_token.token_hash) and verify_api_token(token, api_token.token_hash):
+            api_token.token_hash = token_hash
+            db.commit()
+            return api_token
+    return None
+
 
 async def get_current_user(
     credentials: Optional[HTTPAuthorizationCredentials] = Depends(bearer_scheme),
@@ -27,29 +90,43 @@ async def get_current_user(
 
     token = credentials.credentials
 
-    # Try JWT token first
+    # API tokens carry a fixed prefix and never need a JWT decode
+    if token.startswith(settings.api_token_prefix):
+        token_hash = hash_api_token(token)
+        cached = _api_token_cache.get(token_hash)
+        if cached:
+            last_used_flusher.record(cached[0])
+            user = _load_user(db, cached[1])
+            if user and user.is_active:
+                return user
+            return None
+
+        api_token = db.query(ApiToken).filter(ApiToken.token_hash == token_hash).first()
+        if api_token is None:
+            api_token = _upgrade_legacy_api_token(db, token, token_hash)
+        if api_token is None:
+            return None
+
+        last_used_flusher.record(api_token.id)
+        _api_token_cache.set(token_hash, (api_token.id, api_token.user_id))
+
+        user = _load_user(db, api_token.user_id)
+        if user and user.is_active:
+            return user
+        return None
+
+    # JWTs are three dot-separated segments; skip the decode for anything else
+    if token.count(".") != 2:
+        return None
+
     payload = decode_token(token)
     if payload and payload.get("type") == "access":
         user_id = payload.get("sub")
         if user_id:
-            user = db.query(User).filter(User.id == user_id).first()
+            user = _load_user(db, user_id)
             if user and user.is_active:
                 return user
 
-    # Try API token (starts with prefix)
-    if token.startswith("kc_"):
-        # Use token_prefix for narrowed lookup instead of scanning all tokens
-        prefix = get_token_prefix(token)
-        candidates = db.query(ApiToken).filter(ApiToken.token_prefix == prefix).all()
-        for api_token in candidates:
-            if verify_api_token(token, api_token.token_hash):
-                api_token.last_used = datetime.now(timezone.utc)
-                db.commit()
-
-                user = db.query(User).filter(User.id == api_token.user_id).first()
-                if user and user.is_active:
-                    return user
-
     return None
 
 
@@ -1,47 +1,18 @@
 """Recurring chore reset job."""
+import asyncio
 import logging
-from datetime import datetime, timedelta
+from datetime import datetime
 import time
 
-from sqlalchemy.orm import Session
-from app.database import get_db_session
-from app.models import Chore, ChoreClaim, ScheduledJobLog
+from sqlalchemy import select, update
+from app.database import session_scope, checkpoint_wal
+from app.jobs.job_log import log_job_run
+from app.models import Chore, ChoreClaim
 
 logger = logging.getLogger(__name__)
 
-
-def get_applicable_chores_for_today(db: Session) -> list:
-    """Get all recurring chores that should be active today."""
-    today = datetime.now()
-    day_of_week = today.weekday()  # 0=Monday, 6=Sunday
-
-    # Get all recurring chores
-    chores = db.query(Chore).filter(
-        Chore.recurring_frequency != "none",
-        Chore.recurring_frequency.isnot(None)
-    ).all()
-
-    applicable_chores = []
-    for chore in chores:
-        # Check if chore applies to today
-        if chore.recurring_frequency == "daily":
-            applicable_chores.append(chore)
-        elif chore.recurring_frequency == "weekly":
-            # Check applicable_days - if empty, apply all days
-            if not chore.applicable_days or day_of_week in chore.applicable_days:
-                applicable_chores.append(chore)
-        elif chore.recurring_frequency == "biweekly":
-            # Check if we're in the right week
-            week_number = today.isocalendar()[1]
-            if week_number % 2 == 0:  # Even weeks
-                if not chore.applicable_days or day_of_week in chore.applicable_days:
-                    applicable_chores.append(chore)
-        elif chore.recurring_frequency == "monthly":
-            # First day of the month or specific day
-            if today.day == 1:
-                applicable_chores.append(chore)
-
-    return applicable_chores
+# Claims expired per transaction, keeps each writer-lock hold short
+EXPIRE_BATCH_SIZE = 500
 
 
 async def reset_recurring_chores():
@@ -53,39 +24,63 @@ async def reset_recurring_chores():
     2. Updates last_reset_date on chores
     3. Logs the job execution
     """
-    start_time = time.time()
+    start_time = time.perf_counter()
+    now = datetime.now()
     affected_records = 0
     error_message = None
     status = "success"
 
     try:
-        db = next(get_db_session())
-
-        today = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
-        yesterday = today - timedelta(days=1)
+        with session_scope() as db:
+            today = now.replace(hour=0, minute=0, second=0, microsecond=0)
 
-        # Get recurring chores
-        recurring_chores = db.query(Chore).filter(
-            Chore.recurring_frequency != "none",
-            Chore.recurring_frequency.isnot(None)
-        ).all()
+            is_recurring = (
+                Chore.recurring_frequency != "none",
+                Chore.recurring_frequency.isnot(None)
+            )
 
-        for chore in recurring_chores:
-            # Mark old pending claims as expired (claims from before today)
-            expired_count = db.query(ChoreClaim).filter(
-                ChoreClaim.chore_id == chore.id,
+            # Mark old pending claims on recurring chores as expired (claims from before today).
+            # Done in bounded batches with a commit between each so API writes can
+            # take the SQLite writer lock in between.
+            is_stale = (
                 ChoreClaim.status.in_(["pending", "claimed"]),
                 ChoreClaim.claimed_at < today
-            ).update({"status": "expired"})
-
-            affected_records += expired_count
+            )
+            stale_claims = (
+                select(ChoreClaim.id)
+                .where(
+                    ChoreClaim.chore_id.in_(select(Chore.id).where(*is_recurring)),
+                    *is_stale
+                )
+                .limit(EXPIRE_BATCH_SIZE)
+            )
+            while True:
+                claim_ids = db.execute(stale_claims).scalars().all()
+                if not claim_ids:
+                    break
+                expired = db.execute(
+                    update(ChoreClaim)
+                    # Re-check staleness: a parent may have approved or
+                    # disapproved one of these claims since the SELECT
+                    .where(ChoreClaim.id.in_(claim_ids), *is_stale)
+                    .values(status="expired")
+                    .execution_options(synchronize_session=False)
+                )
+                db.commit()
+                affected_records += expired.rowcount
+                await asyncio.sleep(0)
 
             # Update last_reset_date
-            chore.last_reset_date = today
+            reset = db.execute(
+                update(Chore)
+                .where(*is_recurring)
+                .values(last_reset_date=today)
+                .execution_options(synchronize_session=False)
+            )
 
-        db.commit()
+        checkpoint_wal()
 
-        logger.info(f"Reset {affected_records} chore claims for {len(recurring_chores)} recurring chores")
+        logger.info(f"Reset {affected_records} chore claims for {reset.rowcount} recurring chores")
 
     except Exception as e:
         error_message = str(e)
@@ -94,18 +89,5 @@ async def reset_recurring_chores():
 
     finally:
         # Log the job execution
-        try:
-            duration_ms = int((time.time() - start_time) * 1000)
-            job_log = ScheduledJobLog(
-                job_name="reset_recurring_chores",
-                status=status,
-                error_message=error_message,
-                affected_records=affected_records,
-                duration_ms=duration_ms
-            )
-            db.add(job_log)
-            db.commit()
-        except Exception as log_error:
-            logger.error(f"Error logging job execution: {log_error}")
-        finally:
-            db.close()
+        duration_ms = int((time.perf_counter() - start_time) * 1000)
+        log_job_run("reset_recurring_chores", status, error_message, affected_records, duration_ms)
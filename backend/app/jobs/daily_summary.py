@@ -1,11 +1,13 @@
 """Daily summary email job."""
+import asyncio
 import logging
 from datetime import datetime
 
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import contains_eager
 
-from ..database import SessionLocal
-from ..models import Parent, Kid, NotificationPreference, User
+from ..config import settings
+from ..database import session_scope
+from ..models import NotificationPreference, Parent, Kid, User
 from ..services.email_service import email_service
 
 logger = logging.getLogger(__name__)
@@ -17,55 +19,62 @@ async def send_daily_summary_emails():
         logger.info("Email service not configured, skipping daily summary")
         return
 
-    db: Session = SessionLocal()
+    summaries = []
     try:
-        # Get all parents with linked user accounts
-        parents = db.query(Parent).filter(Parent.user_id.isnot(None)).all()
+        with session_scope() as db:
+            # Only parents whose linked user opted in; daily summary is off by default
+            parents = db.query(Parent).join(Parent.user).join(User.notification_preference).options(
+                contains_eager(Parent.user)
+            ).filter(NotificationPreference.email_daily_summary.is_(True)).all()
 
-        for parent in parents:
-            # Get the linked user to get email
-            user = db.query(User).filter(User.id == parent.user_id).first()
-            if not user or not user.email:
-                continue
+            # Load every associated kid in one query
+            all_kid_ids = {kid_id for p in parents for kid_id in (p.associated_kids or [])}
+            kids_by_id = {
+                kid.id: kid
+                for kid in db.query(Kid).filter(Kid.id.in_(all_kid_ids)).all()
+            } if all_kid_ids else {}
 
-            # Check notification preferences
-            prefs = db.query(NotificationPreference).filter(
-                NotificationPreference.user_id == user.id
-            ).first()
+            for parent in parents:
+                user = parent.user
+                if not user or not user.email:
+                    continue
 
-            # Default: daily summary is off unless explicitly enabled
-            if not prefs or not prefs.email_daily_summary:
-                continue
+                # Get kids associated with this parent
+                associated_kids = parent.associated_kids or []
+                if not associated_kids:
+                    continue
 
-            # Get kids associated with this parent
-            associated_kids = parent.associated_kids or []
-            if not associated_kids:
-                continue
+                kids_summary = []
+                for kid_id in associated_kids:
+                    kid = kids_by_id.get(kid_id)
+                    if kid:
+                        kids_summary.append({
+                            "name": kid.name,
+                            "chores_completed": kid.completed_chores_today,
+                            "points_today": 0,  # Would need to calculate from claims
+                            "streak": kid.overall_chore_streak,
+                            "total_points": kid.points,
+                        })
 
-            kids_summary = []
-            for kid_id in associated_kids:
-                kid = db.query(Kid).filter(Kid.id == kid_id).first()
-                if kid:
-                    kids_summary.append({
-                        "name": kid.name,
-                        "chores_completed": kid.completed_chores_today,
-                        "points_today": 0,  # Would need to calculate from claims
-                        "streak": kid.overall_chore_streak,
-                        "total_points": kid.points,
-                    })
+                if kids_summary:
+                    summaries.append((user.email, parent.name, kids_summary))
 
-            if kids_summary:
+        # Send outside the session so no connection is held during SMTP I/O
+        semaphore = asyncio.Semaphore(settings.email_concurrency)
+
+        async def send(to_email: str, parent_name: str, kids_summary: list):
+            async with semaphore:
                 try:
                     await email_service.send_daily_summary_email(
-                        to_email=user.email,
-                        parent_name=parent.name,
+                        to_email=to_email,
+                        parent_name=parent_name,
                         kids_summary=kids_summary,
                     )
-                    logger.info(f"Sent daily summary to {user.email}")
+                    logger.info(f"Sent daily summary to {to_email}")
                 except Exception as e:
-                    logger.error(f"Failed to send daily summary to {user.email}: {e}")
+                    logger.error(f"Failed to send daily summary to {to_email}: {e}")
+
+        await asyncio.gather(*(send(*summary) for summary in summaries))
 
     except Exception as e:
         logger.error(f"Error in daily summary job: {e}")
-    finally:
-        db.close()
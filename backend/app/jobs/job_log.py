@@ -0,0 +1,49 @@
+"""Execution log shared by the scheduled jobs."""
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+from sqlalchemy import delete, insert
+
+from app.config import settings
+from app.database import engine
+from app.models import ScheduledJobLog
+
+logger = logging.getLogger(__name__)
+
+
+def log_job_run(
+    job_name: str,
+    status: str,
+    error_message: Optional[str],
+    affected_records: int,
+    duration_ms: int,
+) -> None:
+    """Record one job execution.
+
+    Uses a Core INSERT on its own connection, so it works even when the job's
+    session failed, and never raises into the job's finally block.
+    """
+    try:
+        with engine.begin() as conn:
+            conn.execute(insert(ScheduledJobLog).values(
+                job_name=job_name,
+                status=status,
+                error_message=error_message,
+                affected_records=affected_records,
+                duration_ms=duration_ms
+            ))
+    except Exception as log_error:
+        logger.error(f"Error logging job execution: {log_error}")
+
+
+def prune_job_logs() -> int:
+    """Delete job log rows older than the configured retention window."""
+    cutoff = datetime.now(timezone.utc) - timedelta(days=settings.job_log_retention_days)
+    with engine.begin() as conn:
+        result = conn.execute(
+            delete(ScheduledJobLog).where(ScheduledJobLog.executed_at < cutoff)
+        )
+    if result.rowcount:
+        logger.info(f"Pruned {result.rowcount} scheduled job logs older than {cutoff:%Y-%m-%d}")
+    return result.rowcount
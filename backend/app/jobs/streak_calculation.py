@@ -1,11 +1,15 @@
 """Streak calculation job."""
 import logging
+from collections import defaultdict
 from datetime import datetime, timedelta
 import time
 
-from sqlalchemy.orm import Session
-from app.database import get_db_session
-from app.models import Kid, Chore, ChoreClaim, DailyMultiplier, ScheduledJobLog
+from sqlalchemy import select
+from sqlalchemy.orm import load_only
+
+from app.database import session_scope
+from app.jobs.job_log import log_job_run
+from app.models import Kid, Chore, ChoreClaim, DailyMultiplier
 
 logger = logging.getLogger(__name__)
 
@@ -15,56 +19,33 @@ STREAK_MILESTONES = [3, 7, 14, 30, 50, 100, 365]
 # Bonus points for completing all daily chores
 DAILY_COMPLETION_BONUS = 10
 
+# Kids processed per window; bounds memory on large installs
+KID_BATCH_SIZE = 500
 
-def get_todays_chores_for_kid(db: Session, kid_id: str) -> list:
-    """Get all chores assigned to a kid for today."""
-    today = datetime.now()
-    day_of_week = today.weekday()
-
-    # Get chores where kid is in assigned_kids
-    all_chores = db.query(Chore).all()
-
-    kid_chores = []
-    for chore in all_chores:
-        # Check if kid is assigned
-        if kid_id not in (chore.assigned_kids or []):
-            continue
-
-        # Check if chore is applicable today
-        if chore.recurring_frequency == "none" or chore.recurring_frequency is None:
-            continue  # Skip non-recurring chores for streak calculation
 
-        if chore.recurring_frequency == "daily":
-            kid_chores.append(chore)
-        elif chore.recurring_frequency == "weekly":
-            if not chore.applicable_days or day_of_week in chore.applicable_days:
-                kid_chores.append(chore)
-        elif chore.recurring_frequency == "biweekly":
-            week_number = today.isocalendar()[1]
-            if week_number % 2 == 0:
-                if not chore.applicable_days or day_of_week in chore.applicable_days:
-                    kid_chores.append(chore)
-        elif chore.recurring_frequency == "monthly":
-            if today.day == 1:
-                kid_chores.append(chore)
+def _recurrence_predicates(now: datetime) -> dict:
+    """Map recurring_frequency to a check of whether a chore is due on ``now``'s day.
 
-    return kid_chores
-
-
-def get_completed_chores_today(db: Session, kid_id: str, chore_ids: list) -> list:
-    """Get chores completed by kid today."""
-    today = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
-    tomorrow = today + timedelta(days=1)
+    Calendar values are computed once here so the per-chore check is a single
+    dict lookup plus, for weekly chores, a set membership test. Each predicate
+    takes the chore's applicable_days as a set. Frequencies that cannot be due
+    today (biweekly on odd weeks, monthly after the 1st) are left out, so the
+    keys are exactly the live frequencies.
+    """
+    day_of_week = now.weekday()
 
-    completed = db.query(ChoreClaim).filter(
-        ChoreClaim.kid_id == kid_id,
-        ChoreClaim.chore_id.in_(chore_ids),
-        ChoreClaim.status == "approved",
-        ChoreClaim.claimed_at >= today,
-        ChoreClaim.claimed_at < tomorrow
-    ).all()
+    def on_applicable_day(days: set) -> bool:
+        return not days or day_of_week in days
 
-    return [c.chore_id for c in completed]
+    predicates = {
+        "daily": lambda days: True,
+        "weekly": on_applicable_day,
+    }
+    if now.isocalendar()[1] % 2 == 0:
+        predicates["biweekly"] = on_applicable_day
+    if now.day == 1:
+        predicates["monthly"] = lambda days: True
+    return predicates
 
 
 async def calculate_daily_streaks():
@@ -78,97 +59,177 @@ async def calculate_daily_streaks():
     4. Records personal best if exceeded
     5. Awards daily completion bonus if all chores done
     """
-    start_time = time.time()
+    start_time = time.perf_counter()
     affected_records = 0
     error_message = None
     status = "success"
 
     try:
-        db = next(get_db_session())
-
-        today = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
-        kids = db.query(Kid).all()
-
-        for kid in kids:
-            todays_chores = get_todays_chores_for_kid(db, kid.id)
-
-            if not todays_chores:
-                continue  # Kid has no chores assigned for today
-
-            chore_ids = [c.id for c in todays_chores]
-            completed_ids = get_completed_chores_today(db, kid.id, chore_ids)
-
-            total_chores = len(chore_ids)
-            completed_count = len(completed_ids)
-            all_completed = completed_count == total_chores and total_chores > 0
-
-            # Update or create DailyMultiplier record
-            daily_record = db.query(DailyMultiplier).filter(
-                DailyMultiplier.kid_id == kid.id,
-                DailyMultiplier.date == today
-            ).first()
-
-            if not daily_record:
-                daily_record = DailyMultiplier(
-                    kid_id=kid.id,
-                    date=today,
-                    total_chores_for_day=total_chores,
-                    completed_chores=completed_count,
-                    all_completed=all_completed
+        with session_scope() as db:
+            # One clock read for the whole run so the day window and the
+            # recurrence checks cannot straddle midnight
+            now = datetime.now()
+            today = now.replace(hour=0, minute=0, second=0, microsecond=0)
+            tomorrow = today + timedelta(days=1)
+
+            # Load everything the loop needs once instead of querying per kid.
+            # Only plain column rows for frequencies live today are fetched;
+            # changes go out as bulk mappings.
+            predicates = _recurrence_predicates(now)
+            recurring_chores = db.execute(
+                select(Chore.id, Chore.assigned_kids, Chore.recurring_frequency, Chore.applicable_days)
+                .where(Chore.recurring_frequency.in_(list(predicates)))
+            ).all()
+
+            # Evaluate recurrence once per chore, then invert assigned_kids
+            # into kid -> today's chores
+            chores_by_kid = defaultdict(list)
+            due_chore_ids = []
+            for chore in recurring_chores:
+                if predicates[chore.recurring_frequency](set(chore.applicable_days or ())):
+                    due_chore_ids.append(chore.id)
+                    for kid_id in set(chore.assigned_kids or ()):
+                        chores_by_kid[kid_id].append(chore)
+
+            kids_query = db.query(Kid).options(load_only(
+                Kid.id, Kid.name, Kid.points, Kid.overall_chore_streak,
+                Kid.longest_streak_ever, Kid.streak_freeze_count, Kid.chore_streaks
+            )).order_by(Kid.id)
+
+            # Walk kids in id-ordered windows so memory stays flat no matter
+            # how many families the install has
+            last_kid_id = None
+            while True:
+                window = kids_query
+                if last_kid_id is not None:
+                    window = window.filter(Kid.id > last_kid_id)
+                kids = window.limit(KID_BATCH_SIZE).all()
+                if not kids:
+                    break
+                last_kid_id = kids[-1].id
+                kid_ids = [kid.id for kid in kids]
+
+                # Distinct (kid, chore) pairs approved today, limited to chores
+                # that are due; repeat approvals collapse in SQL
+                completed_by_kid = defaultdict(set)
+                approved_today = db.execute(
+                    select(ChoreClaim.kid_id, ChoreClaim.chore_id).where(
+                        ChoreClaim.status == "approved",
+                        ChoreClaim.claimed_at >= today,
+                        ChoreClaim.claimed_at < tomorrow,
+                        ChoreClaim.kid_id.in_(kid_ids),
+                        ChoreClaim.chore_id.in_(due_chore_ids)
+                    ).group_by(ChoreClaim.kid_id, ChoreClaim.chore_id)
                 )
-                db.add(daily_record)
-            else:
-                daily_record.total_chores_for_day = total_chores
-                daily_record.completed_chores = completed_count
-                daily_record.all_completed = all_completed
-
-            # Award daily completion bonus
-            if all_completed and not daily_record.bonus_awarded:
-                daily_record.bonus_awarded = True
-                daily_record.bonus_points = DAILY_COMPLETION_BONUS
-                daily_record.bonus_multiplier = 0.1  # 10% bonus
-                kid.points += DAILY_COMPLETION_BONUS
-                logger.info(f"Awarded {DAILY_COMPLETION_BONUS} bonus points to {kid.name}")
-
-            # Update overall streak
-            if all_completed:
-                kid.overall_chore_streak += 1
-
-                # Check for personal best
-                if kid.overall_chore_streak > kid.longest_streak_ever:
-                    kid.longest_streak_ever = kid.overall_chore_streak
-                    logger.info(f"{kid.name} achieved new personal best streak: {kid.longest_streak_ever}")
-
-                # Check for milestone
-                if kid.overall_chore_streak in STREAK_MILESTONES:
-                    logger.info(f"{kid.name} reached streak milestone: {kid.overall_chore_streak} days!")
-                    # Future: Trigger celebration notification
-            else:
-                # Check if they can use a streak freeze
-                if kid.streak_freeze_count > 0 and kid.overall_chore_streak > 0:
-                    kid.streak_freeze_count -= 1
-                    logger.info(f"{kid.name} used a streak freeze. {kid.streak_freeze_count} remaining.")
-                else:
-                    # Reset streak
-                    if kid.overall_chore_streak > 0:
-                        logger.info(f"{kid.name}'s streak of {kid.overall_chore_streak} days ended")
-                    kid.overall_chore_streak = 0
-
-            kid.last_chore_date = today
-
-            # Update individual chore streaks
-            chore_streaks = kid.chore_streaks or {}
-            for chore_id in chore_ids:
-                current_streak = chore_streaks.get(chore_id, 0)
-                if chore_id in completed_ids:
-                    chore_streaks[chore_id] = current_streak + 1
-                else:
-                    chore_streaks[chore_id] = 0
-            kid.chore_streaks = chore_streaks
-
-            affected_records += 1
-
-        db.commit()
+                for kid_id, chore_id in approved_today:
+                    completed_by_kid[kid_id].add(chore_id)
+
+                daily_by_kid = {
+                    record.kid_id: record
+                    for record in db.execute(
+                        select(DailyMultiplier.id, DailyMultiplier.kid_id, DailyMultiplier.bonus_awarded)
+                        .where(DailyMultiplier.date == today, DailyMultiplier.kid_id.in_(kid_ids))
+                    )
+                }
+
+                # Collect row changes and write them as bulk executemany statements
+                kid_updates = []
+                multiplier_inserts = []
+                multiplier_updates = []
+
+                for kid in kids:
+                    todays_chores = chores_by_kid.get(kid.id)
+
+                    if not todays_chores:
+                        continue  # Kid has no chores assigned for today
+
+                    chore_ids = [c.id for c in todays_chores]
+                    completed_ids = completed_by_kid[kid.id].intersection(chore_ids)
+
+                    total_chores = len(chore_ids)
+                    completed_count = len(completed_ids)
+                    all_completed = completed_count == total_chores and total_chores > 0
+
+                    points = kid.points
+                    streak = kid.overall_chore_streak
+                    longest_streak = kid.longest_streak_ever
+                    freeze_count = kid.streak_freeze_count
+
+                    # Update or create DailyMultiplier record
+                    daily_record = daily_by_kid.get(kid.id)
+                    multiplier = {
+                        "total_chores_for_day": total_chores,
+                        "completed_chores": completed_count,
+                        "all_completed": all_completed,
+                    }
+
+                    # Award daily completion bonus
+                    if all_completed and not (daily_record and daily_record.bonus_awarded):
+                        multiplier["bonus_awarded"] = True
+                        multiplier["bonus_points"] = DAILY_COMPLETION_BONUS
+                        multiplier["bonus_multiplier"] = 0.1  # 10% bonus
+                        points += DAILY_COMPLETION_BONUS
+                        logger.info(f"Awarded {DAILY_COMPLETION_BONUS} bonus points to {kid.name}")
+
+                    if daily_record:
+                        multiplier_updates.append({"id": daily_record.id, **multiplier})
+                    else:
+                        multiplier_inserts.append({"kid_id": kid.id, "date": today, **multiplier})
+
+                    # Update overall streak
+                    if all_completed:
+                        streak += 1
+
+                        # Check for personal best
+                        if streak > longest_streak:
+                            longest_streak = streak
+                            logger.info(f"{kid.name} achieved new personal best streak: {longest_streak}")
+
+                        # Check for milestone
+                        if streak in STREAK_MILESTONES:
+                            logger.info(f"{kid.name} reached streak milestone: {streak} days!")
+                            # Future: Trigger celebration notification
+                    else:
+                        # Check if they can use a streak freeze
+                        if freeze_count > 0 and streak > 0:
+                            freeze_count -= 1
+                            logger.info(f"{kid.name} used a streak freeze. {freeze_count} remaining.")
+                        else:
+                            # Reset streak
+                            if streak > 0:
+                                logger.info(f"{kid.name}'s streak of {streak} days ended")
+                            streak = 0
+
+                    kid_update = {
+                        "id": kid.id,
+                        "points": points,
+                        "overall_chore_streak": streak,
+                        "longest_streak_ever": longest_streak,
+                        "streak_freeze_count": freeze_count,
+                        "last_chore_date": today,
+                    }
+
+                    # Update individual chore streaks; the JSON blob is only
+                    # rewritten when an entry actually changed
+                    chore_streaks = dict(kid.chore_streaks or {})
+                    streaks_changed = False
+                    for chore_id in chore_ids:
+                        new_streak = chore_streaks.get(chore_id, 0) + 1 if chore_id in completed_ids else 0
+                        if chore_streaks.get(chore_id) != new_streak:
+                            chore_streaks[chore_id] = new_streak
+                            streaks_changed = True
+                    if streaks_changed:
+                        kid_update["chore_streaks"] = chore_streaks
+
+                    kid_updates.append(kid_update)
+
+                    affected_records += 1
+
+                db.bulk_insert_mappings(DailyMultiplier, multiplier_inserts)
+                db.bulk_update_mappings(DailyMultiplier, multiplier_updates)
+                db.bulk_update_mappings(Kid, kid_updates)
+                db.flush()
+
         logger.info(f"Calculated streaks for {affected_records} kids")
 
     except Exception as e:
@@ -178,18 +239,5 @@ async def calculate_daily_streaks():
 
     finally:
         # Log the job execution
-        try:
-            duration_ms = int((time.time() - start_time) * 1000)
-            job_log = ScheduledJobLog(
-                job_name="calculate_daily_streaks",
-                status=status,
-                error_message=error_message,
-                affected_records=affected_records,
-                duration_ms=duration_ms
-            )
-            db.add(job_log)
-            db.commit()
-        except Exception as log_error:
-            logger.error(f"Error logging job execution: {log_error}")
-        finally:
-            db.close()
+        duration_ms = int((time.perf_counter() - start_time) * 1000)
+        log_job_run("calculate_daily_streaks", status, error_message, affected_records, duration_ms)
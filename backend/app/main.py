@@ -3,12 +3,14 @@ import logging
 import os
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 from contextlib import asynccontextmanager
 
 from .config import settings
-from .database import init_db, ensure_indexes
+from .database import init_db
+from .pagination import NEXT_CURSOR_HEADER
 from .routers import kids, chores, rewards, parents, approvals, auth, api_tokens, notifications, categories, allowance, history
-from .scheduler import start_scheduler, shutdown_scheduler
+from .services.timestamp_flusher import last_login_flusher, last_used_flusher
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -21,10 +23,11 @@ async def lifespan(app: FastAPI):
     if not settings.jwt_secret_key or settings.jwt_secret_key == "change-me-to-a-random-string":
         raise RuntimeError("JWT_SECRET_KEY must be set to a secure random value")
     init_db()
-    ensure_indexes()
     logger.info("Database initialized")
 
-    # Start background scheduler
+    # Start background scheduler; imported here so APScheduler and the job
+    # modules load at startup rather than whenever app.main is imported
+    from .scheduler import start_scheduler, shutdown_scheduler
     await start_scheduler()
     logger.info("Scheduler started")
 
@@ -34,23 +37,31 @@ async def lifespan(app: FastAPI):
     await shutdown_scheduler()
     logger.info("Scheduler shutdown")
 
+    # Persist any token usage and login times still buffered in memory
+    last_used_flusher.flush()
+    last_login_flusher.flush()
+
+    # Release pooled connections to Google
+    await auth.close_google_client()
+
 
 app = FastAPI(
     title="KidsChores",
     description="Family chore management with points and rewards",
     version="0.7.9",  # Keep in sync with VERSION file
     lifespan=lifespan,
+    default_response_class=ORJSONResponse,  # C encoder for every JSON response
     redirect_slashes=False,  # Prevent 307 redirects for /api/kids vs /api/kids/
 )
 
 # CORS middleware for frontend
-_cors_origins = [o.strip() for o in settings.cors_origins.split(",") if o.strip()]
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=_cors_origins,
+    allow_origins=settings.cors_origins_list,
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER],
 )
 
 # Include routers
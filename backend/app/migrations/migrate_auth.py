@@ -14,22 +14,21 @@ from pathlib import Path
 # Add parent directory to path for imports
 sys.path.insert(0, str(Path(__file__).parent.parent.parent))
 
-from sqlalchemy import create_engine, text
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy import text
 
-from app.models import Base, User, Parent
+from app.database import engine, SessionLocal
+from app.models import Base, User, Parent, generate_uuid
 from app.security import hash_password, hash_pin
-from app.config import settings
+
+DEFAULT_PASSWORD = "changeme123"
 
 
 def run_migration():
     """Run the authentication migration."""
     print("Starting authentication migration...")
 
-    # Create engine and session
-    engine = create_engine(settings.database_url)
-    Session = sessionmaker(bind=engine)
-    session = Session()
+    # Use the app's engine so the same DATABASE_PATH and pragmas apply
+    session = SessionLocal()
 
     try:
         # Check if users table exists, create if not
@@ -44,43 +43,58 @@ def run_migration():
                 print("Tables already exist, proceeding with data migration...")
 
         # Get all parents without user_id
-        parents_to_migrate = session.query(Parent).filter(
-            Parent.user_id.is_(None)
-        ).all()
+        parents_to_migrate = session.query(
+            Parent.id, Parent.name, Parent.pin, Parent.pin_hash
+        ).filter(Parent.user_id.is_(None)).all()
 
         print(f"Found {len(parents_to_migrate)} parents to migrate")
 
+        # Argon2id is deliberately slow and the default password is constant,
+        # so hash it once for every new user
+        default_password_hash = hash_password(DEFAULT_PASSWORD)
+
+        # Resolve emails against one preloaded map instead of a query per parent
+        user_ids_by_email = dict(session.query(User.email, User.id).all())
+        new_users = []
+        parent_updates = []
+
         for parent in parents_to_migrate:
             # Generate email from name
             email = f"{parent.name.lower().replace(' ', '_')}@kidschores.local"
 
             # Check if user with this email already exists
-            existing_user = session.query(User).filter(User.email == email).first()
-            if existing_user:
+            user_id = user_ids_by_email.get(email)
+            if user_id:
                 print(f"  - Linking existing user '{email}' to parent '{parent.name}'")
-                parent.user_id = existing_user.id
             else:
                 # Create new user
                 print(f"  - Creating user '{email}' for parent '{parent.name}'")
-                user = User(
-                    email=email,
-                    password_hash=hash_password("changeme123"),  # Default password
-                    display_name=parent.name,
-                )
-                session.add(user)
-                session.flush()  # Get the ID
-                parent.user_id = user.id
+                user_id = generate_uuid()
+                new_users.append({
+                    "id": user_id,
+                    "email": email,
+                    "password_hash": default_password_hash,
+                    "display_name": parent.name,
+                })
+                user_ids_by_email[email] = user_id
+
+            parent_update = {"id": parent.id, "user_id": user_id}
 
             # Hash existing plaintext PIN if present
             if parent.pin and not parent.pin_hash:
                 print(f"  - Hashing PIN for parent '{parent.name}'")
-                parent.pin_hash = hash_pin(parent.pin)
+                parent_update["pin_hash"] = hash_pin(parent.pin)
                 # Keep legacy pin for now (can remove after verification)
 
+            parent_updates.append(parent_update)
+
+        session.bulk_insert_mappings(User, new_users)
+        session.bulk_update_mappings(Parent, parent_updates)
+
         session.commit()
         print(f"\nMigration complete!")
         print(f"  - {len(parents_to_migrate)} parents migrated")
-        print(f"\nIMPORTANT: All migrated users have default password 'changeme123'")
+        print(f"\nIMPORTANT: All migrated users have default password '{DEFAULT_PASSWORD}'")
         print(f"They should change their password on first login.")
 
     except Exception as e:
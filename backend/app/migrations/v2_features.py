@@ -4,6 +4,7 @@ Adds new columns and tables for: streaks, categories, notifications, allowance.
 
 Run via: python -m app.migrations.v2_features
 """
+import re
 import sqlite3
 import sys
 from pathlib import Path
@@ -15,11 +16,33 @@ def get_db_path() -> str:
     return os.environ.get("DATABASE_URL", "sqlite:///./kidschores.db").replace("sqlite:///", "")
 
 
-def column_exists(cursor: sqlite3.Cursor, table: str, column: str) -> bool:
-    """Check if a column exists in a table."""
-    cursor.execute(f"PRAGMA table_info({table})")
-    columns = [row[1] for row in cursor.fetchall()]
-    return column in columns
+# Column definitions allowed in ALTER TABLE ADD COLUMN; identifiers cannot be
+# bound as parameters, so anything interpolated into DDL is checked first
+ALLOWED_COLUMN_TYPES = {
+    "INTEGER DEFAULT 0",
+    "DATETIME",
+    "TEXT",
+    "TEXT DEFAULT '{}'",
+    "VARCHAR(36)",
+    "VARCHAR(5) DEFAULT '00:00'",
+    "VARCHAR(500)",
+}
+IDENTIFIER_RE = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*$")
+
+
+def get_columns(cursor: sqlite3.Cursor, table: str) -> set[str]:
+    """Get the names of all columns in a table."""
+    cursor.execute("SELECT name FROM pragma_table_info(?)", (table,))
+    return {row[0] for row in cursor.fetchall()}
+
+
+def add_column(cursor: sqlite3.Cursor, table: str, col_name: str, col_type: str) -> None:
+    """Add a column after validating every piece that goes into the DDL."""
+    if not IDENTIFIER_RE.match(table) or not IDENTIFIER_RE.match(col_name):
+        raise ValueError(f"Invalid identifier: {table}.{col_name}")
+    if col_type not in ALLOWED_COLUMN_TYPES:
+        raise ValueError(f"Column type not allowed: {col_type}")
+    cursor.execute(f"ALTER TABLE {table} ADD COLUMN {col_name} {col_type}")
 
 
 def table_exists(cursor: sqlite3.Cursor, table: str) -> bool:
@@ -35,12 +58,18 @@ def migrate(db_path: str = None):
 
     print(f"Running migration on database: {db_path}")
 
-    conn = sqlite3.connect(db_path)
+    # Autocommit mode so the explicit BEGIN below covers the DDL too;
+    # sqlite3 would otherwise commit each ALTER TABLE on its own
+    conn = sqlite3.connect(db_path, isolation_level=None)
     cursor = conn.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
 
     changes_made = 0
 
     try:
+        cursor.execute("BEGIN IMMEDIATE")
+
         # ============================================
         # Kids table - new columns for streaks
         # ============================================
@@ -51,10 +80,11 @@ def migrate(db_path: str = None):
             ("chore_streaks", "TEXT DEFAULT '{}'"),  # JSON stored as TEXT in SQLite
         ]
 
+        existing = get_columns(cursor, "kids")
         for col_name, col_type in kids_columns:
-            if not column_exists(cursor, "kids", col_name):
+            if col_name not in existing:
                 print(f"  Adding column: kids.{col_name}")
-                cursor.execute(f"ALTER TABLE kids ADD COLUMN {col_name} {col_type}")
+                add_column(cursor, "kids", col_name, col_type)
                 changes_made += 1
             else:
                 print(f"  Column exists: kids.{col_name}")
@@ -68,10 +98,11 @@ def migrate(db_path: str = None):
             ("reset_time", "VARCHAR(5) DEFAULT '00:00'"),
         ]
 
+        existing = get_columns(cursor, "chores")
         for col_name, col_type in chores_columns:
-            if not column_exists(cursor, "chores", col_name):
+            if col_name not in existing:
                 print(f"  Adding column: chores.{col_name}")
-                cursor.execute(f"ALTER TABLE chores ADD COLUMN {col_name} {col_type}")
+                add_column(cursor, "chores", col_name, col_type)
                 changes_made += 1
             else:
                 print(f"  Column exists: chores.{col_name}")
@@ -84,10 +115,11 @@ def migrate(db_path: str = None):
             ("photo_url", "VARCHAR(500)"),
         ]
 
+        existing = get_columns(cursor, "chore_claims")
         for col_name, col_type in claims_columns:
-            if not column_exists(cursor, "chore_claims", col_name):
+            if col_name not in existing:
                 print(f"  Adding column: chore_claims.{col_name}")
-                cursor.execute(f"ALTER TABLE chore_claims ADD COLUMN {col_name} {col_type}")
+                add_column(cursor, "chore_claims", col_name, col_type)
                 changes_made += 1
             else:
                 print(f"  Column exists: chore_claims.{col_name}")
@@ -262,12 +294,13 @@ def migrate(db_path: str = None):
                 ("📚", "School", "#3B82F6", 6),
                 ("🐾", "Pet Care", "#EC4899", 7),
             ]
-            for icon, name, color, order in default_categories:
-                cat_id = str(uuid.uuid4())
-                cursor.execute(
-                    "INSERT INTO chore_categories (id, name, icon, color, sort_order) VALUES (?, ?, ?, ?, ?)",
-                    (cat_id, name, icon, color, order)
-                )
+            cursor.executemany(
+                "INSERT INTO chore_categories (id, name, icon, color, sort_order) VALUES (?, ?, ?, ?, ?)",
+                [
+                    (str(uuid.uuid4()), name, icon, color, order)
+                    for icon, name, color, order in default_categories
+                ]
+            )
             changes_made += len(default_categories)
 
         conn.commit()
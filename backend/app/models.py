@@ -1,17 +1,55 @@
 """SQLAlchemy models for KidsChores standalone app."""
 from datetime import datetime, timezone
 from typing import Optional
-import uuid
+import os
+import secrets
+import threading
 
 from sqlalchemy import Boolean, Column, DateTime, Float, ForeignKey, Integer, String, Text, JSON
-from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import relationship
+from sqlalchemy.ext.mutable import MutableDict, MutableList
+from sqlalchemy.orm import DeclarativeBase, column_property, deferred, relationship
 
-Base = declarative_base()
+
+class Base(DeclarativeBase):
+    """Declarative base for all models."""
+
+
+# Random bytes fetched per os.urandom() call when generating ids; one call
+# covers 256 UUIDs instead of one syscall per row
+UUID_POOL_SIZE = 4096
+
+_uuid_pool = threading.local()
+# A forked worker must not hand out the parent's remaining pool bytes
+os.register_at_fork(after_in_child=lambda: _uuid_pool.__dict__.clear())
 
 
 def generate_uuid():
-    return str(uuid.uuid4())
+    """Return a random (version 4) UUID string, drawn from a per-thread entropy pool."""
+    pool = _uuid_pool
+    offset = getattr(pool, "offset", UUID_POOL_SIZE)
+    if offset + 16 > UUID_POOL_SIZE:
+        pool.buf = bytearray(os.urandom(UUID_POOL_SIZE))
+        offset = 0
+    pool.offset = offset + 16
+    b = pool.buf[offset:offset + 16]
+    b[6] = (b[6] & 0x0F) | 0x40  # version 4
+    b[8] = (b[8] & 0x3F) | 0x80  # RFC 4122 variant
+    h = b.hex()
+    return f"{h[:8]}-{h[8:12]}-{h[12:16]}-{h[16:20]}-{h[20:]}"
+
+
+def utcnow():
+    """Default/onupdate for timestamp columns; one shared callable for every model."""
+    return datetime.now(timezone.utc)
+
+
+def generate_short_id():
+    """Return a 12-character random id (72 bits, URL-safe).
+
+    For tables that are never referenced by other rows or JSON lists
+    (API tokens, reset tokens, push subscriptions); older rows keep their UUIDs.
+    """
+    return secrets.token_urlsafe(9)
 
 
 class User(Base):
@@ -25,7 +63,7 @@ class User(Base):
 
     # OAuth fields
     oauth_provider = Column(String(50), nullable=True)  # 'google' or null
-    oauth_id = Column(String(255), nullable=True)  # External provider user ID
+    oauth_id = Column(String(255), nullable=True, index=True)  # External provider user ID
     avatar_url = Column(String(500), nullable=True)
 
     # Account status
@@ -33,25 +71,28 @@ class User(Base):
     is_admin = Column(Boolean, default=False)  # For future admin features
 
     # Timestamps
-    created_at = Column(DateTime, default=lambda: datetime.now(timezone.utc))
+    created_at = Column(DateTime, default=utcnow)
     last_login = Column(DateTime, nullable=True)
 
     # Relationships
-    parent = relationship("Parent", back_populates="user", uselist=False)
-    api_tokens = relationship("ApiToken", back_populates="user")
-    reset_tokens = relationship("PasswordResetToken", back_populates="user")
+    # One-to-one and read on most admin requests, so it rides along on the user SELECT
+    parent = relationship("Parent", back_populates="user", uselist=False, lazy="joined")
+    # Collections never load implicitly; callers opt in with selectinload()
+    api_tokens = relationship("ApiToken", back_populates="user", lazy="raise_on_sql")
+    reset_tokens = relationship("PasswordResetToken", back_populates="user", lazy="raise_on_sql")
+    notification_preference = relationship("NotificationPreference", back_populates="user", uselist=False)
 
 
 class PasswordResetToken(Base):
     """Password reset token for secure password recovery."""
     __tablename__ = "password_reset_tokens"
 
-    id = Column(String(36), primary_key=True, default=generate_uuid)
+    id = Column(String(36), primary_key=True, default=generate_short_id)
     user_id = Column(String(36), ForeignKey("users.id"), nullable=False)
-    token_hash = Column(String(64), nullable=False)  # SHA256 hash of token
+    token_hash = Column(String(64), nullable=False, index=True)  # SHA256 hash of token
     expires_at = Column(DateTime, nullable=False)
     used_at = Column(DateTime, nullable=True)  # Set when token is used
-    created_at = Column(DateTime, default=lambda: datetime.now(timezone.utc))
+    created_at = Column(DateTime, default=utcnow)
 
     # Relationships
     user = relationship("User", back_populates="reset_tokens")
@@ -65,7 +106,7 @@ class ParentInvitation(Base):
     email = Column(String(255), nullable=False, index=True)
     token_hash = Column(String(64), nullable=False, unique=True)  # SHA256 hash of token
     parent_id = Column(String(36), ForeignKey("parents.id"), nullable=False)
-    created_at = Column(DateTime, default=lambda: datetime.now(timezone.utc))
+    created_at = Column(DateTime, default=utcnow)
     expires_at = Column(DateTime, nullable=False)
     is_consumed = Column(Boolean, default=False)
     consumed_at = Column(DateTime, nullable=True)
@@ -78,21 +119,22 @@ class ApiToken(Base):
     """API token for external integrations (e.g., Home Assistant)."""
     __tablename__ = "api_tokens"
 
-    id = Column(String(36), primary_key=True, default=generate_uuid)
+    id = Column(String(36), primary_key=True, default=generate_short_id)
     user_id = Column(String(36), ForeignKey("users.id"), nullable=False)
 
     name = Column(String(100), nullable=False)  # e.g., "Home Assistant"
-    token_hash = Column(String(255), nullable=False)  # bcrypt hash
-    token_prefix = Column(String(12), nullable=False)  # For display (e.g., "kc_abc123...")
+    # SHA256 hex; bcrypt for older tokens until first use. Unique via ux_api_tokens_token_hash
+    token_hash = Column(String(255), nullable=False)
+    token_prefix = Column(String(12), nullable=False, index=True)  # For display (e.g., "kc_abc123...")
 
     # Scopes for fine-grained permissions (future use)
-    scopes = Column(JSON, default=list)
+    scopes = Column(MutableList.as_mutable(JSON), default=list)
 
     # Expiration (null = never expires)
     expires_at = Column(DateTime, nullable=True)
     last_used = Column(DateTime, nullable=True)
 
-    created_at = Column(DateTime, default=lambda: datetime.now(timezone.utc))
+    created_at = Column(DateTime, default=utcnow)
 
     # Relationships
     user = relationship("User", back_populates="api_tokens")
@@ -111,7 +153,7 @@ class Kid(Base):
     # Streak tracking
     overall_chore_streak = Column(Integer, default=0)
     last_chore_date = Column(DateTime, nullable=True)
-    chore_streaks = Column(JSON, default=dict)  # {chore_id: streak_count}
+    chore_streaks = Column(MutableDict.as_mutable(JSON), default=dict)  # {chore_id: streak_count}
     longest_streak_ever = Column(Integer, default=0)
     streak_freeze_count = Column(Integer, default=0)  # Freezes available to preserve streak
 
@@ -122,7 +164,7 @@ class Kid(Base):
     completed_chores_total = Column(Integer, default=0)
 
     # Badges earned (list of badge IDs)
-    badges = Column(JSON, default=list)
+    badges = Column(MutableList.as_mutable(JSON), default=list)
 
     # Notifications
     enable_notifications = Column(Boolean, default=True)
@@ -130,15 +172,16 @@ class Kid(Base):
     # Google OAuth (for kid sign-in via parent-linked Gmail)
     google_email = Column(String(255), nullable=True, unique=True)  # Gmail linked by parent
     google_id = Column(String(255), nullable=True)  # Google OAuth ID (set on first sign-in)
-    user_id = Column(String(36), ForeignKey("users.id"), nullable=True)  # Link to User account
+    user_id = Column(String(36), ForeignKey("users.id"), nullable=True, index=True)  # Link to User account
 
     # Relationships
     user = relationship("User", backref="kid")
-    chore_claims = relationship("ChoreClaim", back_populates="kid")
-    reward_claims = relationship("RewardClaim", back_populates="kid")
+    # Collections never load implicitly; callers opt in with selectinload()
+    chore_claims = relationship("ChoreClaim", back_populates="kid", lazy="raise_on_sql")
+    reward_claims = relationship("RewardClaim", back_populates="kid", lazy="raise_on_sql")
 
-    created_at = Column(DateTime, default=lambda: datetime.now(timezone.utc))
-    updated_at = Column(DateTime, default=lambda: datetime.now(timezone.utc), onupdate=lambda: datetime.now(timezone.utc))
+    created_at = Column(DateTime, default=utcnow)
+    updated_at = Column(DateTime, default=utcnow, onupdate=utcnow)
 
 
 class Parent(Base):
@@ -149,22 +192,24 @@ class Parent(Base):
     name = Column(String(100), nullable=False)
 
     # Link to User account (nullable for migration)
-    user_id = Column(String(36), ForeignKey("users.id"), nullable=True)
+    user_id = Column(String(36), ForeignKey("users.id"), nullable=True, index=True)
 
-    # PIN for approvals (hashed with bcrypt)
-    pin = Column(String(10), nullable=True)  # Legacy plaintext - will be migrated
+    # PIN for approvals (hashed with Argon2id)
+    pin = deferred(Column(String(10), nullable=True))  # Legacy plaintext - will be migrated; only read when pin_hash is unset
     pin_hash = Column(String(255), nullable=True)  # New hashed PIN
+    # Loaded with the row, so "is a legacy PIN set?" never pulls the deferred column
+    has_legacy_pin = column_property(pin.expression.isnot(None))
 
     # Associated kids (list of kid IDs)
-    associated_kids = Column(JSON, default=list)
+    associated_kids = Column(MutableList.as_mutable(JSON), default=list)
 
     # Notifications
     enable_notifications = Column(Boolean, default=True)
 
-    created_at = Column(DateTime, default=lambda: datetime.now(timezone.utc))
+    created_at = Column(DateTime, default=utcnow)
 
     # Relationships
-    user = relationship("User", back_populates="parent")
+    user = relationship("User", back_populates="parent", lazy="joined")
     invitation = relationship("ParentInvitation", back_populates="parent", uselist=False)
 
 
@@ -178,10 +223,12 @@ class ChoreCategory(Base):
     color = Column(String(20), default="#6366f1")  # Hex color
     sort_order = Column(Integer, default=0)
 
-    created_at = Column(DateTime, default=lambda: datetime.now(timezone.utc))
+    created_at = Column(DateTime, default=utcnow)
 
     # Relationships
-    chores = relationship("Chore", back_populates="category")
+    # delete_category clears chores.category_id itself, so deleting a
+    # category never needs to load this collection
+    chores = relationship("Chore", back_populates="category", lazy="raise_on_sql", passive_deletes=True)
 
 
 class Chore(Base):
@@ -195,7 +242,7 @@ class Chore(Base):
     default_points = Column(Integer, default=10)
 
     # Assignment
-    assigned_kids = Column(JSON, default=list)  # List of kid IDs
+    assigned_kids = Column(MutableList.as_mutable(JSON), default=list)  # List of kid IDs
     shared_chore = Column(Boolean, default=False)
 
     # Category
@@ -206,7 +253,7 @@ class Chore(Base):
     recurring_frequency = Column(String(20), default="none")  # none, daily, weekly, biweekly, monthly, custom
     custom_interval = Column(Integer, nullable=True)
     custom_interval_unit = Column(String(10), nullable=True)  # days, weeks
-    applicable_days = Column(JSON, default=list)  # [0-6] for days of week
+    applicable_days = Column(MutableList.as_mutable(JSON), default=list)  # [0-6] for days of week
     due_date = Column(DateTime, nullable=True)
     last_reset_date = Column(DateTime, nullable=True)  # When the chore was last reset
     reset_time = Column(String(5), default="00:00")  # Time to reset (HH:MM)
@@ -225,10 +272,10 @@ class Chore(Base):
     notify_on_disapproval = Column(Boolean, default=True)
 
     # Relationships
-    claims = relationship("ChoreClaim", back_populates="chore")
+    claims = relationship("ChoreClaim", back_populates="chore", lazy="raise_on_sql")
 
-    created_at = Column(DateTime, default=lambda: datetime.now(timezone.utc))
-    updated_at = Column(DateTime, default=lambda: datetime.now(timezone.utc), onupdate=lambda: datetime.now(timezone.utc))
+    created_at = Column(DateTime, default=utcnow)
+    updated_at = Column(DateTime, default=utcnow, onupdate=utcnow)
 
 
 class ChoreClaim(Base):
@@ -236,19 +283,21 @@ class ChoreClaim(Base):
     __tablename__ = "chore_claims"
 
     id = Column(String(36), primary_key=True, default=generate_uuid)
-    kid_id = Column(String(36), ForeignKey("kids.id"), nullable=False, index=True)
-    chore_id = Column(String(36), ForeignKey("chores.id"), nullable=False, index=True)
+    kid_id = Column(String(36), ForeignKey("kids.id"), nullable=False)  # Indexed via ix_chore_claims_kid_claimed_at
+    chore_id = Column(String(36), ForeignKey("chores.id"), nullable=False)  # Indexed via ix_chore_claims_chore_status_claimed
 
-    status = Column(String(20), default="pending", index=True)  # pending, claimed, approved, disapproved, expired
+    # Indexed via the (status, claimed_at, ...) and (status, approved_at, id) composites
+    status = Column(String(20), default="pending")  # pending, claimed, approved, disapproved, expired
     points_awarded = Column(Float, nullable=True)
 
-    claimed_at = Column(DateTime, default=lambda: datetime.now(timezone.utc), index=True)
+    claimed_at = Column(DateTime, default=utcnow, index=True)
     approved_at = Column(DateTime, nullable=True)
     approved_by = Column(String(100), nullable=True)  # Parent name
 
     # Optional details
-    notes = Column(Text, nullable=True)  # Notes from kid about completion
-    photo_url = Column(String(500), nullable=True)  # Proof photo URL
+    # Deferred: only the history views read these, so listings skip them
+    notes = deferred(Column(Text, nullable=True))  # Notes from kid about completion
+    photo_url = deferred(Column(String(500), nullable=True))  # Proof photo URL
 
     # Relationships
     kid = relationship("Kid", back_populates="chore_claims")
@@ -266,10 +315,10 @@ class Reward(Base):
     cost = Column(Integer, default=100)  # Points required
 
     # Eligibility
-    eligible_kids = Column(JSON, default=list)  # Empty = all kids
+    eligible_kids = Column(MutableList.as_mutable(JSON), default=list)  # Empty = all kids
     requires_approval = Column(Boolean, default=True)
 
-    created_at = Column(DateTime, default=lambda: datetime.now(timezone.utc))
+    created_at = Column(DateTime, default=utcnow)
 
 
 class RewardClaim(Base):
@@ -280,10 +329,11 @@ class RewardClaim(Base):
     kid_id = Column(String(36), ForeignKey("kids.id"), nullable=False, index=True)
     reward_id = Column(String(36), ForeignKey("rewards.id"), nullable=False)
 
-    status = Column(String(20), default="pending", index=True)  # pending, approved, disapproved
+    # Indexed via the (status, approved_at, id) composite
+    status = Column(String(20), default="pending")  # pending, approved, disapproved
     points_spent = Column(Integer, nullable=True)
 
-    requested_at = Column(DateTime, default=lambda: datetime.now(timezone.utc))
+    requested_at = Column(DateTime, default=utcnow)
     approved_at = Column(DateTime, nullable=True)
     approved_by = Column(String(100), nullable=True)
 
@@ -308,7 +358,7 @@ class Badge(Base):
     # Bonus for earning
     points_multiplier_bonus = Column(Float, default=0.0)  # Added to multiplier when earned
 
-    created_at = Column(DateTime, default=lambda: datetime.now(timezone.utc))
+    created_at = Column(DateTime, default=utcnow)
 
 
 class Penalty(Base):
@@ -321,7 +371,7 @@ class Penalty(Base):
     icon = Column(String(50), default="mdi:alert")
     points_deduction = Column(Integer, default=10)
 
-    created_at = Column(DateTime, default=lambda: datetime.now(timezone.utc))
+    created_at = Column(DateTime, default=utcnow)
 
 
 class Bonus(Base):
@@ -334,7 +384,7 @@ class Bonus(Base):
     icon = Column(String(50), default="mdi:star")
     points_bonus = Column(Integer, default=10)
 
-    created_at = Column(DateTime, default=lambda: datetime.now(timezone.utc))
+    created_at = Column(DateTime, default=utcnow)
 
 
 # ============================================
@@ -347,7 +397,7 @@ class ScheduledJobLog(Base):
 
     id = Column(String(36), primary_key=True, default=generate_uuid)
     job_name = Column(String(100), nullable=False)
-    executed_at = Column(DateTime, default=lambda: datetime.now(timezone.utc))
+    executed_at = Column(DateTime, default=utcnow)
     status = Column(String(20), default="success")  # success, failed
     error_message = Column(Text, nullable=True)
     affected_records = Column(Integer, default=0)
@@ -370,8 +420,8 @@ class DailyMultiplier(Base):
     bonus_awarded = Column(Boolean, default=False)
     bonus_points = Column(Integer, default=0)
 
-    created_at = Column(DateTime, default=lambda: datetime.now(timezone.utc))
-    updated_at = Column(DateTime, default=lambda: datetime.now(timezone.utc), onupdate=lambda: datetime.now(timezone.utc))
+    created_at = Column(DateTime, default=utcnow)
+    updated_at = Column(DateTime, default=utcnow, onupdate=utcnow)
 
     # Relationships
     kid = relationship("Kid")
@@ -385,15 +435,15 @@ class PushSubscription(Base):
     """Browser push notification subscriptions."""
     __tablename__ = "push_subscriptions"
 
-    id = Column(String(36), primary_key=True, default=generate_uuid)
+    id = Column(String(36), primary_key=True, default=generate_short_id)
     user_id = Column(String(36), ForeignKey("users.id"), nullable=True)
     kid_id = Column(String(36), ForeignKey("kids.id"), nullable=True, index=True)
 
-    endpoint = Column(Text, nullable=False)
+    endpoint = Column(Text, nullable=False, index=True)
     p256dh_key = Column(String(255), nullable=False)
     auth_key = Column(String(255), nullable=False)
 
-    created_at = Column(DateTime, default=lambda: datetime.now(timezone.utc))
+    created_at = Column(DateTime, default=utcnow)
     last_used = Column(DateTime, nullable=True)
 
     # Relationships
@@ -426,11 +476,11 @@ class NotificationPreference(Base):
     quiet_hours_start = Column(String(5), default="22:00")  # HH:MM
     quiet_hours_end = Column(String(5), default="08:00")  # HH:MM
 
-    created_at = Column(DateTime, default=lambda: datetime.now(timezone.utc))
-    updated_at = Column(DateTime, default=lambda: datetime.now(timezone.utc), onupdate=lambda: datetime.now(timezone.utc))
+    created_at = Column(DateTime, default=utcnow)
+    updated_at = Column(DateTime, default=utcnow, onupdate=utcnow)
 
     # Relationships
-    user = relationship("User")
+    user = relationship("User", back_populates="notification_preference")
 
 
 # ============================================
@@ -449,8 +499,8 @@ class AllowanceSettings(Base):
     payout_day = Column(Integer, default=0)  # 0=Sunday, 6=Saturday
     minimum_payout = Column(Float, default=1.0)  # Minimum $1.00
 
-    created_at = Column(DateTime, default=lambda: datetime.now(timezone.utc))
-    updated_at = Column(DateTime, default=lambda: datetime.now(timezone.utc), onupdate=lambda: datetime.now(timezone.utc))
+    created_at = Column(DateTime, default=utcnow)
+    updated_at = Column(DateTime, default=utcnow, onupdate=utcnow)
 
     # Relationships
     kid = relationship("Kid")
@@ -461,7 +511,7 @@ class AllowancePayout(Base):
     __tablename__ = "allowance_payouts"
 
     id = Column(String(36), primary_key=True, default=generate_uuid)
-    kid_id = Column(String(36), ForeignKey("kids.id"), nullable=False, index=True)
+    kid_id = Column(String(36), ForeignKey("kids.id"), nullable=False)  # Indexed via ix_allowance_payouts_kid_status
 
     points_converted = Column(Integer, nullable=False)
     dollar_amount = Column(Float, nullable=False)
@@ -469,7 +519,7 @@ class AllowancePayout(Base):
     status = Column(String(20), default="pending", index=True)  # pending, paid, cancelled
     notes = Column(Text, nullable=True)
 
-    requested_at = Column(DateTime, default=lambda: datetime.now(timezone.utc))
+    requested_at = Column(DateTime, default=utcnow)
     paid_at = Column(DateTime, nullable=True)
     paid_by = Column(String(100), nullable=True)
 
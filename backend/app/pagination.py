@@ -0,0 +1,32 @@
+"""Keyset (cursor) pagination helpers for newest-first list endpoints."""
+import base64
+import binascii
+from datetime import datetime
+from typing import Optional, Tuple
+
+from fastapi import HTTPException, Response
+
+# Response header carrying the cursor for the next page; absent on the last page
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def encode_cursor(timestamp: datetime, row_id: str) -> str:
+    """Encode the (timestamp, id) sort key of the last row on a page."""
+    raw = f"{timestamp.isoformat()}|{row_id}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, str]:
+    """Decode a cursor from encode_cursor; raises 400 if it is malformed."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        timestamp, row_id = raw.split("|", 1)
+        return datetime.fromisoformat(timestamp), row_id
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def set_next_cursor(response: Response, timestamp: Optional[datetime], row_id: str) -> None:
+    """Advertise the next page, unless the last row has no sort timestamp."""
+    if timestamp is not None:
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(timestamp, row_id)
@@ -1,15 +1,19 @@
 """Allowance management API endpoints."""
 import logging
 from datetime import datetime, timezone
-from typing import List, Optional
-from fastapi import APIRouter, Depends, HTTPException
+from typing import List, Optional, Tuple
+from fastapi import APIRouter, Depends, HTTPException, Response
+from sqlalchemy import func, tuple_, update
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from sqlalchemy.orm import Session
 from pydantic import BaseModel
 
 logger = logging.getLogger(__name__)
 
+from ..cache import TTLCache
 from ..database import get_db
 from ..deps import require_auth, require_admin
+from ..pagination import decode_cursor, set_next_cursor
 from ..models import Kid, AllowanceSettings, AllowancePayout, User
 
 router = APIRouter()
@@ -77,34 +81,78 @@ class AllowanceSummary(BaseModel):
     total_paid_count: int
 
 
-@router.get("/settings/{kid_id}", response_model=AllowanceSettingsResponse)
-def get_allowance_settings(kid_id: str, db: Session = Depends(get_db), _user: User = Depends(require_auth)):
-    """Get allowance settings for a kid."""
-    kid = db.query(Kid).filter(Kid.id == kid_id).first()
-    if not kid:
-        raise HTTPException(status_code=404, detail="Kid not found")
+def _get_or_create_settings(db: Session, kid_id: str) -> AllowanceSettings:
+    """Return the kid's allowance settings, inserting the defaults if missing.
 
-    # Get or create settings
+    The common case is a single SELECT. A missing row is created with
+    INSERT ... ON CONFLICT DO NOTHING RETURNING, so no refresh SELECT is needed
+    and two first requests racing on the unique kid_id can't fail. The caller
+    commits.
+    """
     settings = db.query(AllowanceSettings).filter(
         AllowanceSettings.kid_id == kid_id
     ).first()
+    if settings is None:
+        settings = db.scalars(
+            sqlite_insert(AllowanceSettings)
+            .values(kid_id=kid_id)
+            .on_conflict_do_nothing(index_elements=["kid_id"])
+            .returning(AllowanceSettings)
+        ).first()
+    if settings is None:
+        # Lost the race: another request inserted the row first
+        settings = db.query(AllowanceSettings).filter(
+            AllowanceSettings.kid_id == kid_id
+        ).one()
+    return settings
 
-    if not settings:
-        settings = AllowanceSettings(kid_id=kid_id)
-        db.add(settings)
-        db.commit()
-        db.refresh(settings)
 
-    return AllowanceSettingsResponse(
-        id=settings.id,
-        kid_id=settings.kid_id,
-        points_per_dollar=settings.points_per_dollar,
-        auto_payout=settings.auto_payout,
-        payout_day=settings.payout_day,
-        minimum_payout=settings.minimum_payout,
+# Committed settings rows by kid_id. They only change through the PUT below,
+# which drops the entry, so the TTL is just a backstop
+_settings_cache = TTLCache(maxsize=1024, ttl=300)
+_SETTINGS_FIELDS = ("id", "kid_id", "points_per_dollar", "auto_payout", "payout_day", "minimum_payout")
+
+
+def _settings_snapshot(db: Session, kid_id: str) -> Tuple[dict, bool]:
+    """Return (settings values, cached) for a kid, creating default settings if needed.
+
+    Cache only after commit (see _remember_settings) so a rolled-back insert
+    never leaves a phantom row id behind.
+    """
+    snapshot = _settings_cache.get(kid_id)
+    if snapshot is not None:
+        return snapshot, True
+    settings = _get_or_create_settings(db, kid_id)
+    return {f: getattr(settings, f) for f in _SETTINGS_FIELDS}, False
+
+
+def _remember_settings(snapshot: dict) -> None:
+    _settings_cache.set(snapshot["kid_id"], snapshot)
+
+
+def invalidate_allowance_settings() -> None:
+    """Forget all cached settings (call after bulk deletes)."""
+    _settings_cache.clear()
+
+
+@router.get("/settings/{kid_id}", response_model=AllowanceSettingsResponse)
+def get_allowance_settings(kid_id: str, db: Session = Depends(get_db), _user: User = Depends(require_auth)):
+    """Get allowance settings for a kid."""
+    kid = db.get(Kid, kid_id)
+    if not kid:
+        raise HTTPException(status_code=404, detail="Kid not found")
+
+    settings, cached = _settings_snapshot(db, kid_id)
+    response = AllowanceSettingsResponse(
+        **settings,
         kid_points=kid.points,
-        dollar_equivalent=kid.points / settings.points_per_dollar,
+        dollar_equivalent=kid.points / settings["points_per_dollar"],
     )
+    if not cached:
+        # Persist a freshly created row (a no-op otherwise)
+        db.commit()
+        _remember_settings(settings)
+    return response
 
 
 @router.put("/settings/{kid_id}", response_model=AllowanceSettingsResponse)
@@ -115,17 +163,11 @@ def update_allowance_settings(
     _admin: User = Depends(require_admin),
 ):
     """Update allowance settings for a kid."""
-    kid = db.query(Kid).filter(Kid.id == kid_id).first()
+    kid = db.get(Kid, kid_id)
     if not kid:
         raise HTTPException(status_code=404, detail="Kid not found")
 
-    settings = db.query(AllowanceSettings).filter(
-        AllowanceSettings.kid_id == kid_id
-    ).first()
-
-    if not settings:
-        settings = AllowanceSettings(kid_id=kid_id)
-        db.add(settings)
+    settings = _get_or_create_settings(db, kid_id)
 
     # Apply updates
     update_data = update.model_dump(exclude_unset=True)
@@ -133,6 +175,7 @@ def update_allowance_settings(
         setattr(settings, field, value)
 
     db.commit()
+    _settings_cache.pop(kid_id)
     db.refresh(settings)
 
     return AllowanceSettingsResponse(
@@ -155,23 +198,17 @@ def request_payout(
     _user: User = Depends(require_auth),
 ):
     """Request a payout (convert points to money)."""
-    kid = db.query(Kid).filter(Kid.id == kid_id).first()
+    kid = db.get(Kid, kid_id)
     if not kid:
         raise HTTPException(status_code=404, detail="Kid not found")
 
-    # Get settings
-    settings = db.query(AllowanceSettings).filter(
-        AllowanceSettings.kid_id == kid_id
-    ).first()
-
-    if not settings:
-        settings = AllowanceSettings(kid_id=kid_id)
-        db.add(settings)
-        db.commit()
-        db.refresh(settings)
+    # Get settings; a new row is committed together with the payout
+    settings, cached = _settings_snapshot(db, kid_id)
+    points_per_dollar = settings["points_per_dollar"]
+    minimum_payout = settings["minimum_payout"]
 
     # Calculate dollar amount
-    dollar_amount = request.points_to_convert / settings.points_per_dollar
+    dollar_amount = request.points_to_convert / points_per_dollar
 
     # Validate
     if request.points_to_convert > kid.points:
@@ -180,14 +217,23 @@ def request_payout(
             detail=f"Not enough points. You have {kid.points:.0f} points."
         )
 
-    if dollar_amount < settings.minimum_payout:
+    if dollar_amount < minimum_payout:
         raise HTTPException(
             status_code=400,
-            detail=f"Minimum payout is ${settings.minimum_payout:.2f}"
+            detail=f"Minimum payout is ${minimum_payout:.2f}"
         )
 
-    # Deduct points immediately
-    kid.points -= request.points_to_convert
+    # Deduct points immediately. The balance check is repeated inside the
+    # UPDATE so two concurrent conversions can't both spend the same points
+    remaining = db.execute(
+        update(Kid)
+        .where(Kid.id == kid_id, Kid.points >= request.points_to_convert)
+        .values(points=Kid.points - request.points_to_convert)
+        .returning(Kid.points)
+    ).scalar_one_or_none()
+    if remaining is None:
+        db.rollback()
+        raise HTTPException(status_code=400, detail="Not enough points.")
 
     # Create payout record
     payout = AllowancePayout(
@@ -200,77 +246,65 @@ def request_payout(
     )
     db.add(payout)
     db.commit()
+    if not cached:
+        _remember_settings(settings)
     db.refresh(payout)
 
-    return PayoutResponse(
-        id=payout.id,
-        kid_id=payout.kid_id,
-        points_converted=payout.points_converted,
-        dollar_amount=payout.dollar_amount,
-        payout_method=payout.payout_method,
-        status=payout.status,
-        notes=payout.notes,
-        requested_at=payout.requested_at,
-        paid_at=payout.paid_at,
-        paid_by=payout.paid_by,
-    )
+    return PayoutResponse.model_validate(payout)
+
+
+# List endpoints select exactly the response columns: no ORM instances, no
+# identity-map bookkeeping
+_PAYOUT_COLUMNS = [getattr(AllowancePayout, f) for f in PayoutResponse.model_fields]
+
+
+def _payout_list(rows) -> List[PayoutResponse]:
+    """Wrap payout rows for a list response without re-validating them.
+
+    The values come straight from typed columns, so model_construct is safe.
+    """
+    return [PayoutResponse.model_construct(**row._mapping) for row in rows]
 
 
 @router.get("/payouts/{kid_id}", response_model=List[PayoutResponse])
 def get_payouts(
     kid_id: str,
+    response: Response,
     status: Optional[str] = None,
     limit: int = 50,
+    cursor: Optional[str] = None,
     db: Session = Depends(get_db),
     _user: User = Depends(require_auth),
 ):
-    """Get payout history for a kid."""
-    query = db.query(AllowancePayout).filter(AllowancePayout.kid_id == kid_id)
+    """Get payout history for a kid, newest first.
+
+    Pass the X-Next-Cursor header of one page as ``cursor`` to get the next.
+    """
+    query = db.query(*_PAYOUT_COLUMNS).filter(AllowancePayout.kid_id == kid_id)
 
     if status:
         query = query.filter(AllowancePayout.status == status)
+    if cursor:
+        cursor_ts, cursor_id = decode_cursor(cursor)
+        query = query.filter(tuple_(AllowancePayout.requested_at, AllowancePayout.id) < (cursor_ts, cursor_id))
 
-    payouts = query.order_by(AllowancePayout.requested_at.desc()).limit(limit).all()
-
-    return [
-        PayoutResponse(
-            id=p.id,
-            kid_id=p.kid_id,
-            points_converted=p.points_converted,
-            dollar_amount=p.dollar_amount,
-            payout_method=p.payout_method,
-            status=p.status,
-            notes=p.notes,
-            requested_at=p.requested_at,
-            paid_at=p.paid_at,
-            paid_by=p.paid_by,
-        )
-        for p in payouts
-    ]
+    payouts = query.order_by(
+        AllowancePayout.requested_at.desc(), AllowancePayout.id.desc()
+    ).limit(limit).all()
+
+    if payouts and len(payouts) == limit:
+        set_next_cursor(response, payouts[-1].requested_at, payouts[-1].id)
+    return _payout_list(payouts)
 
 
 @router.get("/pending", response_model=List[PayoutResponse])
 def get_all_pending_payouts(db: Session = Depends(get_db), _admin: User = Depends(require_admin)):
     """Get all pending payouts across all kids."""
-    payouts = db.query(AllowancePayout).filter(
+    payouts = db.query(*_PAYOUT_COLUMNS).filter(
         AllowancePayout.status == "pending"
     ).order_by(AllowancePayout.requested_at.asc()).all()
 
-    return [
-        PayoutResponse(
-            id=p.id,
-            kid_id=p.kid_id,
-            points_converted=p.points_converted,
-            dollar_amount=p.dollar_amount,
-            payout_method=p.payout_method,
-            status=p.status,
-            notes=p.notes,
-            requested_at=p.requested_at,
-            paid_at=p.paid_at,
-            paid_by=p.paid_by,
-        )
-        for p in payouts
-    ]
+    return _payout_list(payouts)
 
 
 class MarkPaidRequest(BaseModel):
@@ -287,9 +321,7 @@ def mark_payout_paid(
     _admin: User = Depends(require_admin),
 ):
     """Mark a payout as paid."""
-    payout = db.query(AllowancePayout).filter(
-        AllowancePayout.id == payout_id
-    ).first()
+    payout = db.get(AllowancePayout, payout_id)
 
     if not payout:
         raise HTTPException(status_code=404, detail="Payout not found")
@@ -309,26 +341,13 @@ def mark_payout_paid(
     db.commit()
     db.refresh(payout)
 
-    return PayoutResponse(
-        id=payout.id,
-        kid_id=payout.kid_id,
-        points_converted=payout.points_converted,
-        dollar_amount=payout.dollar_amount,
-        payout_method=payout.payout_method,
-        status=payout.status,
-        notes=payout.notes,
-        requested_at=payout.requested_at,
-        paid_at=payout.paid_at,
-        paid_by=payout.paid_by,
-    )
+    return PayoutResponse.model_validate(payout)
 
 
 @router.post("/payouts/{payout_id}/cancel", response_model=PayoutResponse)
 def cancel_payout(payout_id: str, db: Session = Depends(get_db), _admin: User = Depends(require_admin)):
     """Cancel a pending payout and refund points."""
-    payout = db.query(AllowancePayout).filter(
-        AllowancePayout.id == payout_id
-    ).first()
+    payout = db.get(AllowancePayout, payout_id)
 
     if not payout:
         raise HTTPException(status_code=404, detail="Payout not found")
@@ -340,7 +359,7 @@ def cancel_payout(payout_id: str, db: Session = Depends(get_db), _admin: User =
         )
 
     # Refund points
-    kid = db.query(Kid).filter(Kid.id == payout.kid_id).first()
+    kid = db.get(Kid, payout.kid_id)
     if kid:
         kid.points += payout.points_converted
 
@@ -348,50 +367,38 @@ def cancel_payout(payout_id: str, db: Session = Depends(get_db), _admin: User =
     db.commit()
     db.refresh(payout)
 
-    return PayoutResponse(
-        id=payout.id,
-        kid_id=payout.kid_id,
-        points_converted=payout.points_converted,
-        dollar_amount=payout.dollar_amount,
-        payout_method=payout.payout_method,
-        status=payout.status,
-        notes=payout.notes,
-        requested_at=payout.requested_at,
-        paid_at=payout.paid_at,
-        paid_by=payout.paid_by,
-    )
+    return PayoutResponse.model_validate(payout)
 
 
 @router.get("/summary/{kid_id}", response_model=AllowanceSummary)
 def get_allowance_summary(kid_id: str, db: Session = Depends(get_db), _user: User = Depends(require_auth)):
-    """Get allowance summary for a kid."""
-    kid = db.query(Kid).filter(Kid.id == kid_id).first()
+    """Get allowance summary for a kid.
+
+    Two statements whatever the payout history size: the kid's name, points and
+    rate, then the payout aggregate. Only columns are selected, no entities.
+    """
+    kid = db.query(
+        Kid.name, Kid.points, AllowanceSettings.points_per_dollar
+    ).outerjoin(AllowanceSettings, AllowanceSettings.kid_id == Kid.id).filter(Kid.id == kid_id).first()
     if not kid:
         raise HTTPException(status_code=404, detail="Kid not found")
 
-    settings = db.query(AllowanceSettings).filter(
-        AllowanceSettings.kid_id == kid_id
-    ).first()
-
-    points_per_dollar = settings.points_per_dollar if settings else 100
-
-    # Calculate pending payouts
-    pending_payouts = db.query(AllowancePayout).filter(
-        AllowancePayout.kid_id == kid_id,
-        AllowancePayout.status == "pending"
-    ).all()
-
-    pending_count = len(pending_payouts)
-    pending_amount = sum(p.dollar_amount for p in pending_payouts)
-
-    # Calculate total paid
-    paid_payouts = db.query(AllowancePayout).filter(
-        AllowancePayout.kid_id == kid_id,
-        AllowancePayout.status == "paid"
-    ).all()
-
-    total_paid = sum(p.dollar_amount for p in paid_payouts)
-    total_paid_count = len(paid_payouts)
+    points_per_dollar = kid.points_per_dollar or 100
+
+    # Pending and paid totals in one grouped aggregate
+    totals = {
+        status: (count, amount)
+        for status, count, amount in db.query(
+            AllowancePayout.status,
+            func.count(),
+            func.coalesce(func.sum(AllowancePayout.dollar_amount), 0.0),
+        ).filter(
+            AllowancePayout.kid_id == kid_id,
+            AllowancePayout.status.in_(("pending", "paid")),
+        ).group_by(AllowancePayout.status)
+    }
+    pending_count, pending_amount = totals.get("pending", (0, 0.0))
+    total_paid_count, total_paid = totals.get("paid", (0, 0.0))
 
     return AllowanceSummary(
         kid_id=kid_id,
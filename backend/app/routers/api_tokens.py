@@ -1,5 +1,5 @@
 """API token management endpoints."""
-from datetime import datetime, timezone
+from datetime import datetime, timedelta, timezone
 from typing import List, Optional
 
 from fastapi import APIRouter, Depends, HTTPException, status
@@ -7,7 +7,7 @@ from pydantic import BaseModel
 from sqlalchemy.orm import Session
 
 from ..database import get_db
-from ..deps import require_auth
+from ..deps import require_auth, invalidate_api_token
 from ..models import User, ApiToken
 from ..security import generate_api_token, get_token_prefix
 
@@ -50,17 +50,26 @@ class TokenResponse(BaseModel):
 # --- Endpoints ---
 
 @router.get("", response_model=List[TokenResponse])
-async def list_tokens(
+def list_tokens(
     user: User = Depends(require_auth),
     db: Session = Depends(get_db)
 ):
     """List all API tokens for the current user."""
-    tokens = db.query(ApiToken).filter(ApiToken.user_id == user.id).all()
-    return [TokenResponse.model_validate(t) for t in tokens]
+    # Only the displayed columns; token_hash never leaves the database here
+    tokens = db.query(
+        ApiToken.id, ApiToken.name, ApiToken.token_prefix, ApiToken.scopes,
+        ApiToken.expires_at, ApiToken.last_used, ApiToken.created_at,
+    ).filter(ApiToken.user_id == user.id).all()
+
+    # Trusted DB rows: skip per-field validation
+    return [
+        TokenResponse.model_construct(**{**t._mapping, "scopes": t.scopes or []})
+        for t in tokens
+    ]
 
 
 @router.post("", response_model=TokenCreatedResponse)
-async def create_token(
+def create_token(
     request: CreateTokenRequest,
     user: User = Depends(require_auth),
     db: Session = Depends(get_db)
@@ -76,7 +85,6 @@ async def create_token(
     # Calculate expiration
     expires_at = None
     if request.expires_in_days:
-        from datetime import timedelta
         expires_at = datetime.now(timezone.utc) + timedelta(days=request.expires_in_days)
 
     # Create token record
@@ -104,18 +112,16 @@ async def create_token(
 
 
 @router.delete("/{token_id}")
-async def delete_token(
+def delete_token(
     token_id: str,
     user: User = Depends(require_auth),
     db: Session = Depends(get_db)
 ):
     """Delete an API token."""
-    token = db.query(ApiToken).filter(
-        ApiToken.id == token_id,
-        ApiToken.user_id == user.id
-    ).first()
+    token = db.get(ApiToken, token_id)
 
-    if not token:
+    # Someone else's token is reported exactly like a missing one
+    if token is None or token.user_id != user.id:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Token not found"
@@ -123,23 +129,22 @@ async def delete_token(
 
     db.delete(token)
     db.commit()
+    invalidate_api_token(token_id)
 
     return {"message": "Token deleted successfully"}
 
 
 @router.get("/{token_id}", response_model=TokenResponse)
-async def get_token(
+def get_token(
     token_id: str,
     user: User = Depends(require_auth),
     db: Session = Depends(get_db)
 ):
     """Get details of a specific API token."""
-    token = db.query(ApiToken).filter(
-        ApiToken.id == token_id,
-        ApiToken.user_id == user.id
-    ).first()
+    token = db.get(ApiToken, token_id)
 
-    if not token:
+    # Someone else's token is reported exactly like a missing one
+    if token is None or token.user_id != user.id:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Token not found"
@@ -1,13 +1,16 @@
 """Approvals API endpoints - pending chore/reward approvals."""
 import logging
-from typing import List
-from fastapi import APIRouter, Depends
-from sqlalchemy.orm import Session, joinedload
+from typing import List, Optional
+from fastapi import APIRouter, Depends, Response
+from sqlalchemy import func, literal, select, tuple_, union_all
+from sqlalchemy.orm import Session
 
 logger = logging.getLogger(__name__)
 
+from ..cache import TTLCache
 from ..database import get_db
 from ..deps import require_auth
+from ..pagination import decode_cursor, set_next_cursor
 from ..models import ChoreClaim, RewardClaim, Kid, Chore, Reward, User
 from ..schemas import (
     PendingApprovalsResponse, ChoreClaimResponse, RewardClaimResponse,
@@ -16,19 +19,32 @@ from ..schemas import (
 
 router = APIRouter()
 
+# The dashboard badge polls the pending count; a few seconds of staleness is
+# fine and claim/approve endpoints drop the entry as soon as anything changes
+_pending_count_cache = TTLCache(maxsize=1, ttl=5)
+
+
+def invalidate_pending_count() -> None:
+    """Forget the cached pending count (call after a claim changes status)."""
+    _pending_count_cache.clear()
+
+
+# Fixed statements, built once at import; SQLAlchemy's compiled cache then
+# serves them without rebuilding the expression tree per request
+_PENDING_CHORE_CLAIMS = select(ChoreClaim).where(ChoreClaim.status == "claimed")
+_PENDING_REWARD_CLAIMS = select(RewardClaim).where(RewardClaim.status == "pending")
+# Both counts as scalar subqueries of one SELECT: one round-trip
+_PENDING_COUNTS = select(
+    select(func.count()).where(ChoreClaim.status == "claimed").scalar_subquery(),
+    select(func.count()).where(RewardClaim.status == "pending").scalar_subquery(),
+)
+
 
 @router.get("/pending", response_model=PendingApprovalsResponse)
 def get_pending_approvals(db: Session = Depends(get_db), _user: User = Depends(require_auth)):
     """Get all pending approvals for parents to review."""
-    # Get pending chore claims
-    chore_claims = db.query(ChoreClaim).filter(
-        ChoreClaim.status == "claimed"
-    ).all()
-
-    # Get pending reward claims
-    reward_claims = db.query(RewardClaim).filter(
-        RewardClaim.status == "pending"
-    ).all()
+    chore_claims = db.scalars(_PENDING_CHORE_CLAIMS).all()
+    reward_claims = db.scalars(_PENDING_REWARD_CLAIMS).all()
 
     return PendingApprovalsResponse(
         chores=[ChoreClaimResponse.model_validate(c) for c in chore_claims],
@@ -39,70 +55,73 @@ def get_pending_approvals(db: Session = Depends(get_db), _user: User = Depends(r
 @router.get("/pending/count", response_model=PendingCountResponse)
 def get_pending_count(db: Session = Depends(get_db), _user: User = Depends(require_auth)):
     """Get count of pending approvals."""
-    chore_count = db.query(ChoreClaim).filter(
-        ChoreClaim.status == "claimed"
-    ).count()
+    cached = _pending_count_cache.get("counts")
+    if cached is not None:
+        return cached
 
-    reward_count = db.query(RewardClaim).filter(
-        RewardClaim.status == "pending"
-    ).count()
+    chore_count, reward_count = db.execute(_PENDING_COUNTS).one()
 
-    return {
+    counts = {
         "chores": chore_count,
         "rewards": reward_count,
         "total": chore_count + reward_count
     }
+    _pending_count_cache.set("counts", counts)
+    return counts
 
 
 @router.get("/history", response_model=List[ApprovalHistoryItem])
 def get_approval_history(
+    response: Response,
     limit: int = 50,
+    cursor: Optional[str] = None,
     db: Session = Depends(get_db),
     _user: User = Depends(require_auth),
 ):
-    """Get recent approval history."""
-    chore_history = db.query(ChoreClaim).options(
-        joinedload(ChoreClaim.kid),
-        joinedload(ChoreClaim.chore),
-    ).filter(
-        ChoreClaim.status.in_(["approved", "disapproved"])
-    ).order_by(ChoreClaim.approved_at.desc()).limit(limit).all()
-
-    reward_history = db.query(RewardClaim).options(
-        joinedload(RewardClaim.kid),
-        joinedload(RewardClaim.reward),
-    ).filter(
-        RewardClaim.status.in_(["approved", "disapproved"])
-    ).order_by(RewardClaim.approved_at.desc()).limit(limit).all()
-
-    # Combine and sort
-    all_history = []
-
-    for claim in chore_history:
-        all_history.append({
-            "type": "chore",
-            "id": claim.id,
-            "kid_name": claim.kid.name if claim.kid else "Unknown",
-            "item_name": claim.chore.name if claim.chore else "Unknown",
-            "status": claim.status,
-            "points": claim.points_awarded,
-            "approved_by": claim.approved_by,
-            "timestamp": claim.approved_at
-        })
-
-    for claim in reward_history:
-        all_history.append({
-            "type": "reward",
-            "id": claim.id,
-            "kid_name": claim.kid.name if claim.kid else "Unknown",
-            "item_name": claim.reward.name if claim.reward else "Unknown",
-            "status": claim.status,
-            "points": -claim.points_spent if claim.points_spent else 0,
-            "approved_by": claim.approved_by,
-            "timestamp": claim.approved_at
-        })
-
-    # Sort by timestamp
-    all_history.sort(key=lambda x: x["timestamp"] or "", reverse=True)
-
-    return all_history[:limit]
+    """Get recent approval history, newest first.
+
+    Pass the X-Next-Cursor header of one page as ``cursor`` to get the next.
+    """
+    chore_filters = [ChoreClaim.status.in_(["approved", "disapproved"])]
+    reward_filters = [RewardClaim.status.in_(["approved", "disapproved"])]
+    if cursor:
+        cursor_ts, cursor_id = decode_cursor(cursor)
+        chore_filters.append(tuple_(ChoreClaim.approved_at, ChoreClaim.id) < (cursor_ts, cursor_id))
+        reward_filters.append(tuple_(RewardClaim.approved_at, RewardClaim.id) < (cursor_ts, cursor_id))
+
+    # Both claim tables projected onto the response shape; the database merges,
+    # sorts and limits, so exactly one page of rows comes back
+    chore_q = select(
+        literal("chore").label("type"),
+        ChoreClaim.id,
+        func.coalesce(Kid.name, "Unknown").label("kid_name"),
+        func.coalesce(Chore.name, "Unknown").label("item_name"),
+        ChoreClaim.status,
+        ChoreClaim.points_awarded.label("points"),
+        ChoreClaim.approved_by,
+        ChoreClaim.approved_at.label("timestamp"),
+    ).outerjoin(Kid, Kid.id == ChoreClaim.kid_id).outerjoin(
+        Chore, Chore.id == ChoreClaim.chore_id
+    ).where(*chore_filters)
+
+    reward_q = select(
+        literal("reward"),
+        RewardClaim.id,
+        func.coalesce(Kid.name, "Unknown"),
+        func.coalesce(Reward.name, "Unknown"),
+        RewardClaim.status,
+        -func.coalesce(RewardClaim.points_spent, 0),
+        RewardClaim.approved_by,
+        RewardClaim.approved_at,
+    ).outerjoin(Kid, Kid.id == RewardClaim.kid_id).outerjoin(
+        Reward, Reward.id == RewardClaim.reward_id
+    ).where(*reward_filters)
+
+    history = union_all(chore_q, reward_q).subquery()
+    rows = db.execute(
+        select(history).order_by(history.c.timestamp.desc(), history.c.id.desc()).limit(limit)
+    ).all()
+
+    if rows and len(rows) == limit:
+        set_next_cursor(response, rows[-1].timestamp, rows[-1].id)
+    return [ApprovalHistoryItem.model_construct(**row._mapping) for row in rows]
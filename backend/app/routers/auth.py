@@ -1,4 +1,5 @@
 """Authentication endpoints."""
+import asyncio
 import logging
 import time
 from collections import defaultdict
@@ -9,12 +10,13 @@ logger = logging.getLogger(__name__)
 
 import httpx
 from fastapi import APIRouter, Depends, HTTPException, Request, status
-from pydantic import BaseModel, EmailStr
+from pydantic import BaseModel
+from sqlalchemy import exists, or_, select
 from sqlalchemy.orm import Session
 
 from ..config import settings
 from ..database import get_db
-from ..deps import get_current_user, require_auth
+from ..deps import get_current_user, invalidate_user, require_auth
 from ..models import User, Parent, Kid, PasswordResetToken, ParentInvitation
 from ..schemas import (
     PasswordResetRequest,
@@ -23,6 +25,7 @@ from ..schemas import (
     PasswordResetTokenStatus,
     ParentInvitationAccept,
     ParentInvitationTokenStatus,
+    LoginEmail,
 )
 import hashlib
 from ..security import (
@@ -35,9 +38,10 @@ from ..security import (
     verify_pin,
     needs_rehash,
     generate_reset_token,
-    verify_reset_token,
+    hash_reset_token,
 )
 from ..services.email_service import email_service
+from ..services.timestamp_flusher import last_login_flusher
 
 
 # --- Rate Limiting ---
@@ -67,14 +71,14 @@ router = APIRouter()
 # --- Request/Response Schemas ---
 
 class RegisterRequest(BaseModel):
-    email: EmailStr
+    email: LoginEmail
     password: str
     display_name: str
     pin: Optional[str] = None  # Optional 4-digit PIN
 
 
 class LoginRequest(BaseModel):
-    email: EmailStr
+    email: LoginEmail
     password: str
 
 
@@ -139,21 +143,20 @@ async def register(request: RegisterRequest, db: Session = Depends(get_db)):
             detail="Password must be at least 8 characters"
         )
 
-    # Check if email already exists
-    existing = db.query(User).filter(User.email == request.email.lower()).first()
-    if existing:
+    # Check if email already exists (EXISTS probe; no row is loaded)
+    if db.query(exists().where(User.email == request.email)).scalar():
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Email already registered"
         )
 
     # First registered user is automatically admin
-    is_first_user = db.query(User).count() == 0
+    is_first_user = not db.query(exists().select_from(User)).scalar()
 
     # Create user
     user = User(
-        email=request.email.lower(),
-        password_hash=hash_password(request.password),
+        email=request.email,
+        password_hash=await asyncio.to_thread(hash_password, request.password),
         display_name=request.display_name,
         is_admin=is_first_user,
     )
@@ -164,7 +167,7 @@ async def register(request: RegisterRequest, db: Session = Depends(get_db)):
     parent = Parent(
         name=request.display_name,
         user_id=user.id,
-        pin_hash=hash_pin(request.pin) if request.pin else None,
+        pin_hash=await asyncio.to_thread(hash_pin, request.pin) if request.pin else None,
     )
     db.add(parent)
     db.commit()
@@ -185,7 +188,7 @@ async def login(request: LoginRequest, req: Request, db: Session = Depends(get_d
     client_ip = req.client.host if req.client else "unknown"
     _check_rate_limit(client_ip)
 
-    user = db.query(User).filter(User.email == request.email.lower()).first()
+    user = db.query(User).filter(User.email == request.email).first()
 
     if not user or not user.password_hash:
         raise HTTPException(
@@ -193,7 +196,8 @@ async def login(request: LoginRequest, req: Request, db: Session = Depends(get_d
             detail="Invalid email or password"
         )
 
-    if not verify_password(request.password, user.password_hash):
+    # Argon2 is deliberately slow; keep it off the event loop
+    if not await asyncio.to_thread(verify_password, request.password, user.password_hash):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid email or password"
@@ -205,13 +209,14 @@ async def login(request: LoginRequest, req: Request, db: Session = Depends(get_d
             detail="Account is disabled"
         )
 
-    # Transparent rehash: upgrade SHA256 -> bcrypt on successful login
+    # Transparent rehash: upgrade SHA256/bcrypt -> Argon2id on successful login
     if needs_rehash(user.password_hash):
-        user.password_hash = hash_password(request.password)
+        user.password_hash = await asyncio.to_thread(hash_password, request.password)
 
-    # Update last login
-    user.last_login = datetime.now(timezone.utc)
-    db.commit()
+    # Only a rehash needs a commit here; last_login is written in batches
+    if db.dirty:
+        db.commit()
+    last_login_flusher.record(user.id)
 
     # Generate tokens
     access_token = create_access_token({"sub": user.id})
@@ -260,6 +265,27 @@ async def refresh(request: RefreshRequest, db: Session = Depends(get_db)):
     )
 
 
+# Shared client for the Google OAuth calls, so repeat sign-ins reuse pooled
+# keep-alive connections instead of a fresh TCP+TLS handshake each time
+_google_client: Optional[httpx.AsyncClient] = None
+
+
+def _get_google_client() -> httpx.AsyncClient:
+    global _google_client
+    if _google_client is None or _google_client.is_closed:
+        _google_client = httpx.AsyncClient(
+            timeout=10.0,
+            limits=httpx.Limits(max_keepalive_connections=20),
+        )
+    return _google_client
+
+
+async def close_google_client() -> None:
+    """Close the shared Google OAuth client (called on app shutdown)."""
+    if _google_client is not None:
+        await _google_client.aclose()
+
+
 @router.post("/google", response_model=TokenResponse)
 async def google_auth(request: GoogleAuthRequest, db: Session = Depends(get_db)):
     """Exchange Google authorization code for tokens."""
@@ -269,18 +295,19 @@ async def google_auth(request: GoogleAuthRequest, db: Session = Depends(get_db))
             detail="Google OAuth not configured"
         )
 
+    client = _get_google_client()
+
     # Exchange code for Google tokens
-    async with httpx.AsyncClient() as client:
-        token_response = await client.post(
-            "https://oauth2.googleapis.com/token",
-            data={
-                "code": request.code,
-                "client_id": settings.google_client_id,
-                "client_secret": settings.google_client_secret,
-                "redirect_uri": settings.google_redirect_uri,
-                "grant_type": "authorization_code",
-            },
-        )
+    token_response = await client.post(
+        "https://oauth2.googleapis.com/token",
+        data={
+            "code": request.code,
+            "client_id": settings.google_client_id,
+            "client_secret": settings.google_client_secret,
+            "redirect_uri": settings.google_redirect_uri,
+            "grant_type": "authorization_code",
+        },
+    )
 
     if token_response.status_code != 200:
         raise HTTPException(
@@ -292,11 +319,10 @@ async def google_auth(request: GoogleAuthRequest, db: Session = Depends(get_db))
     google_access_token = token_data.get("access_token")
 
     # Get user info from Google
-    async with httpx.AsyncClient() as client:
-        userinfo_response = await client.get(
-            "https://www.googleapis.com/oauth2/v2/userinfo",
-            headers={"Authorization": f"Bearer {google_access_token}"},
-        )
+    userinfo_response = await client.get(
+        "https://www.googleapis.com/oauth2/v2/userinfo",
+        headers={"Authorization": f"Bearer {google_access_token}"},
+    )
 
     if userinfo_response.status_code != 200:
         raise HTTPException(
@@ -334,22 +360,29 @@ async def google_auth(request: GoogleAuthRequest, db: Session = Depends(get_db))
         user.oauth_provider = "google"
         user.oauth_id = google_id
         user.avatar_url = picture
-        user.last_login = datetime.now(timezone.utc)
         db.commit()
+        invalidate_user(user.id)
+        last_login_flusher.record(user.id)
 
         # JWT with kid role
         access_token = create_access_token({"sub": user.id, "role": "kid", "kid_id": kid.id})
         refresh_token = create_refresh_token({"sub": user.id, "role": "kid", "kid_id": kid.id})
         return TokenResponse(access_token=access_token, refresh_token=refresh_token)
 
-    # Parent sign-in flow: find or create user
-    user = db.query(User).filter(
-        (User.oauth_provider == "google") & (User.oauth_id == google_id)
-    ).first()
+    # Parent sign-in flow: find or create user. One query fetches both the
+    # account already linked to this Google ID and any account with this email.
+    candidates = db.query(User).filter(or_(
+        (User.oauth_provider == "google") & (User.oauth_id == google_id),
+        User.email == email,
+    )).all()
+    user = next(
+        (u for u in candidates if u.oauth_provider == "google" and u.oauth_id == google_id),
+        None,
+    )
 
     if not user:
         # Check if email exists (link accounts)
-        user = db.query(User).filter(User.email == email).first()
+        user = candidates[0] if candidates else None
         if user:
             # Link Google to existing account
             user.oauth_provider = "google"
@@ -374,8 +407,11 @@ async def google_auth(request: GoogleAuthRequest, db: Session = Depends(get_db))
             )
             db.add(parent)
 
-    user.last_login = datetime.now(timezone.utc)
-    db.commit()
+    # A returning, already-linked account has nothing to write here
+    if db.new or db.dirty:
+        db.commit()
+        invalidate_user(user.id)
+    last_login_flusher.record(user.id)
 
     # Generate tokens with parent role
     access_token = create_access_token({"sub": user.id, "role": "parent"})
@@ -390,35 +426,47 @@ async def google_auth(request: GoogleAuthRequest, db: Session = Depends(get_db))
 @router.get("/me", response_model=MeResponse)
 async def get_me(user: User = Depends(require_auth), db: Session = Depends(get_db)):
     """Get current user profile with parent and kids."""
-    # Check if this user is linked to a kid (kid session)
-    kid = db.query(Kid).filter(Kid.user_id == user.id).first()
+    # Parent profile via the user relationship (no separate query)
+    parent = user.parent
+    associated_kids = (parent.associated_kids or []) if parent else []
+
+    # One query answers both "is this a kid session?" and "which kids
+    # does this parent see?"
+    match = Kid.user_id == user.id
+    if associated_kids:
+        match = or_(match, Kid.id.in_(associated_kids))
+    rows = db.execute(
+        select(Kid.id, Kid.name, Kid.points, Kid.user_id).where(match)
+    ).all()
+
+    # Everything below comes straight from the database, so the response
+    # models are constructed without re-validating it
+    user_response = UserResponse.model_construct(
+        **{name: getattr(user, name) for name in UserResponse.model_fields}
+    )
+
+    kid = next((r for r in rows if r.user_id == user.id), None)
     if kid:
-        return MeResponse(
-            user=UserResponse.model_validate(user),
+        return MeResponse.model_construct(
+            user=user_response,
             parent=None,
-            kids=[KidSummary(id=kid.id, name=kid.name, points=kid.points)],
+            kids=[KidSummary.model_construct(id=kid.id, name=kid.name, points=kid.points)],
             role="kid",
             kid_id=kid.id,
         )
 
-    # Parent session: get parent profile
-    parent = db.query(Parent).filter(Parent.user_id == user.id).first()
-
-    # Get associated kids
-    kids = []
-    if parent and parent.associated_kids:
-        kids_query = db.query(Kid).filter(Kid.id.in_(parent.associated_kids)).all()
-        kids = [
-            KidSummary(id=k.id, name=k.name, points=k.points)
-            for k in kids_query
-        ]
+    kids = [
+        KidSummary.model_construct(id=k.id, name=k.name, points=k.points)
+        for k in rows
+        if k.id in associated_kids
+    ]
 
-    return MeResponse(
-        user=UserResponse.model_validate(user),
+    return MeResponse.model_construct(
+        user=user_response,
         parent={
             "id": parent.id,
             "name": parent.name,
-            "has_pin": bool(parent.pin_hash or parent.pin),
+            "has_pin": bool(parent.pin_hash or parent.has_legacy_pin),
             "associated_kids": parent.associated_kids or [],
         } if parent else None,
         kids=kids,
@@ -433,7 +481,7 @@ async def verify_pin_endpoint(
     db: Session = Depends(get_db)
 ):
     """Verify parent PIN for protected actions."""
-    parent = db.query(Parent).filter(Parent.user_id == user.id).first()
+    parent = user.parent
 
     if not parent:
         raise HTTPException(
@@ -443,16 +491,16 @@ async def verify_pin_endpoint(
 
     # Check hashed PIN first, fall back to legacy plaintext
     if parent.pin_hash:
-        valid = verify_pin(request.pin, parent.pin_hash)
-        # Rehash if using legacy SHA256
+        valid = await asyncio.to_thread(verify_pin, request.pin, parent.pin_hash)
+        # Rehash if using legacy bcrypt/SHA256
         if valid and needs_rehash(parent.pin_hash):
-            parent.pin_hash = hash_pin(request.pin)
+            parent.pin_hash = await asyncio.to_thread(hash_pin, request.pin)
             db.commit()
-    elif parent.pin:
+    elif parent.has_legacy_pin:
         # Legacy plaintext comparison + migrate to hashed
         valid = request.pin == parent.pin
         if valid:
-            parent.pin_hash = hash_pin(request.pin)
+            parent.pin_hash = await asyncio.to_thread(hash_pin, request.pin)
             parent.pin = None  # Remove plaintext
             db.commit()
     else:
@@ -484,7 +532,7 @@ async def forgot_password(request: PasswordResetRequest, db: Session = Depends(g
     - Rate limited to 3 requests per email per hour
     - Invalidates previous reset tokens for the same user
     """
-    email = request.email.lower().strip()
+    email = request.email
 
     # Always return success message (prevent user enumeration)
     success_message = "If an account with that email exists, you will receive a password reset link."
@@ -565,19 +613,13 @@ async def reset_password(request: PasswordResetVerify, db: Session = Depends(get
             detail="Password must be at least 8 characters"
         )
 
-    # Find all unexpired, unused tokens
+    # Look up the unexpired, unused token by its hash (indexed)
     now = datetime.now(timezone.utc)
-    tokens = db.query(PasswordResetToken).filter(
+    valid_token = db.query(PasswordResetToken).filter(
+        PasswordResetToken.token_hash == hash_reset_token(request.token),
         PasswordResetToken.expires_at > now,
         PasswordResetToken.used_at.is_(None),
-    ).all()
-
-    # Check each token (we store hash, so need to verify)
-    valid_token = None
-    for token in tokens:
-        if verify_reset_token(request.token, token.token_hash):
-            valid_token = token
-            break
+    ).first()
 
     if not valid_token:
         raise HTTPException(
@@ -594,12 +636,13 @@ async def reset_password(request: PasswordResetVerify, db: Session = Depends(get
         )
 
     # Update password
-    user.password_hash = hash_password(request.new_password)
+    user.password_hash = await asyncio.to_thread(hash_password, request.new_password)
 
     # Mark token as used
     valid_token.used_at = now
 
     db.commit()
+    invalidate_user(user.id)
 
     # Send confirmation email
     await email_service.send_password_changed_email(
@@ -619,23 +662,22 @@ async def verify_reset_token_endpoint(token: str, db: Session = Depends(get_db))
 
     Used by frontend to validate token before showing password form.
     """
-    # Find all unexpired, unused tokens
+    # Look up the unexpired, unused token by its hash (indexed)
     now = datetime.now(timezone.utc)
-    tokens = db.query(PasswordResetToken).filter(
+    reset_token = db.query(PasswordResetToken).filter(
+        PasswordResetToken.token_hash == hash_reset_token(token),
         PasswordResetToken.expires_at > now,
         PasswordResetToken.used_at.is_(None),
-    ).all()
+    ).first()
 
-    # Check each token
-    for reset_token in tokens:
-        if verify_reset_token(token, reset_token.token_hash):
-            # Get user email for display
-            user = db.query(User).filter(User.id == reset_token.user_id).first()
-            if user:
-                # Mask email for privacy (show only first 2 chars and domain)
-                email_parts = user.email.split("@")
-                masked_email = email_parts[0][:2] + "***@" + email_parts[1]
-                return PasswordResetTokenStatus(valid=True, email=masked_email)
+    if reset_token:
+        # Get user email for display
+        user = db.query(User).filter(User.id == reset_token.user_id).first()
+        if user:
+            # Mask email for privacy (show only first 2 chars and domain)
+            email_parts = user.email.split("@")
+            masked_email = email_parts[0][:2] + "***@" + email_parts[1]
+            return PasswordResetTokenStatus(valid=True, email=masked_email)
 
     return PasswordResetTokenStatus(valid=False)
 
@@ -731,8 +773,7 @@ async def accept_invitation(
         )
 
     # Check if email is already registered
-    existing_user = db.query(User).filter(User.email == invitation.email.lower()).first()
-    if existing_user:
+    if db.query(exists().where(User.email == invitation.email.lower())).scalar():
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="An account with this email already exists. Please log in instead."
@@ -742,7 +783,7 @@ async def accept_invitation(
     display_name = request.display_name if request.display_name else parent.name
     user = User(
         email=invitation.email.lower(),
-        password_hash=hash_password(request.password),
+        password_hash=await asyncio.to_thread(hash_password, request.password),
         display_name=display_name,
     )
     db.add(user)
@@ -2,7 +2,7 @@
 import logging
 from typing import List, Optional
 from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy import func
+from sqlalchemy import insert
 from sqlalchemy.orm import Session
 from pydantic import BaseModel
 
@@ -122,23 +122,23 @@ def get_predefined_categories(_user: User = Depends(require_auth)):
 @router.post("/seed-defaults")
 def seed_default_categories(db: Session = Depends(get_db), _admin: User = Depends(require_admin)):
     """Seed the database with predefined categories."""
-    created = []
-    for i, cat_data in enumerate(PREDEFINED_CATEGORIES):
-        # Check if category already exists
-        existing = db.query(ChoreCategory).filter(
-            func.lower(ChoreCategory.name) == cat_data["name"].lower()
-        ).first()
-        if not existing:
-            category = ChoreCategory(
-                name=cat_data["name"],
-                icon=cat_data["icon"],
-                color=cat_data["color"],
-                sort_order=i,
-            )
-            db.add(category)
-            created.append(cat_data["name"])
-
-    db.commit()
+    existing = {name.lower() for (name,) in db.query(ChoreCategory.name)}
+    rows = [
+        {
+            "name": cat_data["name"],
+            "icon": cat_data["icon"],
+            "color": cat_data["color"],
+            "sort_order": i,
+        }
+        for i, cat_data in enumerate(PREDEFINED_CATEGORIES)
+        if cat_data["name"].lower() not in existing
+    ]
+    if rows:
+        # One executemany INSERT; column defaults (id, timestamps) still apply
+        db.execute(insert(ChoreCategory), rows)
+        db.commit()
+
+    created = [row["name"] for row in rows]
     return {"created": created, "count": len(created)}
 
 
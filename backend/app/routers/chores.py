@@ -3,9 +3,9 @@ import logging
 from datetime import datetime, timedelta, timezone
 from typing import List
 from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, selectinload
 
-from ..database import get_db
+from ..database import get_db, json_contains
 from ..deps import require_auth, require_admin
 from ..models import Chore, ChoreClaim, Kid, DailyMultiplier, PushSubscription, User, Parent
 from ..schemas import (
@@ -15,6 +15,7 @@ from ..schemas import (
 )
 from ..services.push_service import push_service
 from ..services.email_service import email_service
+from .approvals import invalidate_pending_count
 
 logger = logging.getLogger(__name__)
 
@@ -76,18 +77,17 @@ async def email_notify_parents_chore_claimed(db: Session, kid_id: str, kid_name:
     try:
         if not email_service.is_configured():
             return
-        parents = db.query(Parent).all()
+        parents = db.query(Parent).filter(json_contains(Parent.associated_kids, kid_id)).all()
         for parent in parents:
-            if kid_id in (parent.associated_kids or []):
-                if parent.user_id:
-                    user = db.query(User).filter(User.id == parent.user_id).first()
-                    if user and user.email:
-                        await email_service.send_chore_claimed_email(
-                            to_email=user.email,
-                            parent_name=parent.name,
-                            kid_name=kid_name,
-                            chore_name=chore_name,
-                        )
+            if parent.user_id:
+                user = parent.user
+                if user and user.email:
+                    await email_service.send_chore_claimed_email(
+                        to_email=user.email,
+                        parent_name=parent.name,
+                        kid_name=kid_name,
+                        chore_name=chore_name,
+                    )
     except Exception as e:
         logger.error(f"Background task email_notify_parents_chore_claimed failed: {e}")
 
@@ -138,7 +138,7 @@ def update_chore(chore_id: str, chore_update: ChoreUpdate, db: Session = Depends
 @router.delete("/{chore_id}")
 def delete_chore(chore_id: str, db: Session = Depends(get_db), _admin: User = Depends(require_admin)):
     """Delete chore."""
-    chore = db.query(Chore).filter(Chore.id == chore_id).first()
+    chore = db.query(Chore).options(selectinload(Chore.claims)).filter(Chore.id == chore_id).first()
     if not chore:
         raise HTTPException(status_code=404, detail="Chore not found")
 
@@ -160,13 +160,10 @@ def get_todays_chores(kid_id: str, db: Session = Depends(get_db), _user: User =
     today_end = today_start + timedelta(days=1)
 
     # Get all chores where kid is assigned
-    all_chores = db.query(Chore).all()
+    all_chores = db.query(Chore).filter(json_contains(Chore.assigned_kids, kid_id)).all()
     result = []
 
     for chore in all_chores:
-        if kid_id not in (chore.assigned_kids or []):
-            continue
-
         # Check if chore is applicable today based on recurring settings
         is_applicable = False
         is_recurring = False
@@ -231,33 +228,32 @@ def get_chores_for_kid(kid_id: str, db: Session = Depends(get_db), _user: User =
         raise HTTPException(status_code=404, detail="Kid not found")
 
     # Get all chores where kid is assigned
-    chores = db.query(Chore).all()
+    chores = db.query(Chore).filter(json_contains(Chore.assigned_kids, kid_id)).all()
     result = []
 
     for chore in chores:
-        if kid_id in (chore.assigned_kids or []):
-            # Check if there's an active claim
-            claim = db.query(ChoreClaim).filter(
-                ChoreClaim.chore_id == chore.id,
-                ChoreClaim.kid_id == kid_id,
-                ChoreClaim.status.in_(["claimed", "pending"])
-            ).first()
-
-            status = "pending"
-            claimed_by = None
-            if claim:
-                status = claim.status
-                claimed_by = kid.name
-
-            # Check if overdue
-            if chore.due_date and chore.due_date < datetime.now(timezone.utc) and status == "pending":
-                status = "overdue"
-
-            result.append(ChoreWithStatus(
-                **{k: v for k, v in chore.__dict__.items() if not k.startswith('_')},
-                status=status,
-                claimed_by=claimed_by
-            ))
+        # Check if there's an active claim
+        claim = db.query(ChoreClaim).filter(
+            ChoreClaim.chore_id == chore.id,
+            ChoreClaim.kid_id == kid_id,
+            ChoreClaim.status.in_(["claimed", "pending"])
+        ).first()
+
+        status = "pending"
+        claimed_by = None
+        if claim:
+            status = claim.status
+            claimed_by = kid.name
+
+        # Check if overdue
+        if chore.due_date and chore.due_date < datetime.now(timezone.utc) and status == "pending":
+            status = "overdue"
+
+        result.append(ChoreWithStatus(
+            **{k: v for k, v in chore.__dict__.items() if not k.startswith('_')},
+            status=status,
+            claimed_by=claimed_by
+        ))
 
     return result
 
@@ -305,6 +301,7 @@ def claim_chore(
     chore.last_claimed = datetime.now(timezone.utc)
 
     db.commit()
+    invalidate_pending_count()
     db.refresh(claim)
 
     # Send push notification to parents (in background)
@@ -344,7 +341,7 @@ def approve_chore(
     # Derive parent_name from JWT if not provided
     parent_name = request.parent_name
     if not parent_name:
-        parent = db.query(Parent).filter(Parent.user_id == admin.id).first()
+        parent = admin.parent
         parent_name = parent.name if parent else (admin.display_name or admin.email)
 
     # Update claim
@@ -368,6 +365,7 @@ def approve_chore(
     chore.last_completed = datetime.now(timezone.utc)
 
     db.commit()
+    invalidate_pending_count()
     db.refresh(claim)
 
     # Send push notification to kid (in background)
@@ -392,7 +390,7 @@ def disapprove_chore(chore_id: str, request: ChoreApproveRequest, db: Session =
     # Derive parent_name from JWT if not provided
     parent_name = request.parent_name
     if not parent_name:
-        parent = db.query(Parent).filter(Parent.user_id == admin.id).first()
+        parent = admin.parent
         parent_name = parent.name if parent else (admin.display_name or admin.email)
 
     claim.status = "disapproved"
@@ -400,4 +398,5 @@ def disapprove_chore(chore_id: str, request: ChoreApproveRequest, db: Session =
     claim.approved_by = parent_name
 
     db.commit()
+    invalidate_pending_count()
     return {"message": "Chore disapproved"}
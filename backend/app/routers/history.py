@@ -1,10 +1,13 @@
 """Chore history and analytics API endpoints."""
+import csv
+import io
 import logging
 from collections import defaultdict
 from datetime import datetime, timedelta, timezone
 from typing import List, Optional
-from fastapi import APIRouter, Depends, Query
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from sqlalchemy.orm import Session, undefer
 from sqlalchemy import func, and_
 from pydantic import BaseModel
 
@@ -104,6 +107,7 @@ def get_history(
     # Base query with joins to avoid N+1
     query = (
         db.query(ChoreClaim, Chore, ChoreCategory)
+        .options(undefer(ChoreClaim.notes))
         .join(Chore, ChoreClaim.chore_id == Chore.id, isouter=True)
         .join(ChoreCategory, Chore.category_id == ChoreCategory.id, isouter=True)
         .filter(ChoreClaim.kid_id == kid_id)
@@ -163,7 +167,6 @@ def get_analytics(
     """Get analytics summary for a kid."""
     kid = db.query(Kid).filter(Kid.id == kid_id).first()
     if not kid:
-        from fastapi import HTTPException
         raise HTTPException(status_code=404, detail="Kid not found")
 
     # Date ranges — strip tzinfo for SQLite compatibility (SQLite stores naive datetimes;
@@ -313,19 +316,15 @@ def export_history_csv(
     _user: User = Depends(require_auth),
 ):
     """Export history as CSV."""
-    from fastapi.responses import StreamingResponse
-    import io
-    import csv
-
     # Get kid
     kid = db.query(Kid).filter(Kid.id == kid_id).first()
     if not kid:
-        from fastapi import HTTPException
         raise HTTPException(status_code=404, detail="Kid not found")
 
     # Query claims with joins to avoid N+1
     query = (
         db.query(ChoreClaim, Chore, ChoreCategory)
+        .options(undefer(ChoreClaim.notes))
         .join(Chore, ChoreClaim.chore_id == Chore.id, isouter=True)
         .join(ChoreCategory, Chore.category_id == ChoreCategory.id, isouter=True)
         .filter(ChoreClaim.kid_id == kid_id)
@@ -3,11 +3,12 @@ import logging
 from datetime import datetime, timedelta
 from typing import List
 from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from sqlalchemy import exists
+from sqlalchemy.orm import Session, selectinload
 
 logger = logging.getLogger(__name__)
 
-from ..database import get_db
+from ..database import get_db, json_contains
 from ..deps import require_auth, require_admin
 from ..models import Kid, Chore, ChoreClaim, DailyMultiplier, User
 from ..schemas import (
@@ -67,7 +68,9 @@ def update_kid(kid_id: str, kid_update: KidUpdate, db: Session = Depends(get_db)
 @router.delete("/{kid_id}")
 def delete_kid(kid_id: str, db: Session = Depends(get_db), _admin: User = Depends(require_admin)):
     """Delete kid."""
-    kid = db.query(Kid).filter(Kid.id == kid_id).first()
+    kid = db.query(Kid).options(
+        selectinload(Kid.chore_claims), selectinload(Kid.reward_claims)
+    ).filter(Kid.id == kid_id).first()
     if not kid:
         raise HTTPException(status_code=404, detail="Kid not found")
 
@@ -204,13 +207,10 @@ def get_daily_progress(kid_id: str, db: Session = Depends(get_db), _user: User =
     day_of_week = today.weekday()
 
     # Get all recurring chores assigned to kid for today
-    all_chores = db.query(Chore).all()
+    all_chores = db.query(Chore).filter(json_contains(Chore.assigned_kids, kid_id)).all()
     todays_chore_ids = []
 
     for chore in all_chores:
-        if kid_id not in (chore.assigned_kids or []):
-            continue
-
         # Only count recurring chores for daily progress
         if chore.recurring_frequency == "daily":
             todays_chore_ids.append(chore.id)
@@ -272,8 +272,7 @@ def link_google(kid_id: str, body: LinkGoogleRequest, db: Session = Depends(get_
         raise HTTPException(status_code=404, detail="Kid not found")
 
     # Check email not already used by another kid
-    existing = db.query(Kid).filter(Kid.google_email == body.email.lower(), Kid.id != kid_id).first()
-    if existing:
+    if db.query(exists().where(Kid.google_email == body.email.lower(), Kid.id != kid_id)).scalar():
         raise HTTPException(status_code=409, detail="Email already linked to another kid")
 
     kid.google_email = body.email.lower()
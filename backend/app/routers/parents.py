@@ -16,7 +16,7 @@ from sqlalchemy.orm import Session
 from ..database import get_db
 from ..deps import require_auth, require_admin
 from ..models import Parent, ParentInvitation, User
-from ..security import verify_pin, hash_pin
+from ..security import verify_pin, hash_pin, needs_rehash
 from ..schemas import (
     ParentCreate,
     ParentResponse,
@@ -178,15 +178,18 @@ def verify_pin_endpoint(parent_id: str, request: VerifyPinRequest, db: Session =
         raise HTTPException(status_code=404, detail="Parent not found")
 
     # No PIN set — allow
-    if not parent.pin_hash and not parent.pin:
+    if not parent.pin_hash and not parent.has_legacy_pin:
         return {"valid": True, "message": "No PIN set"}
 
     # Try hashed PIN first
     if parent.pin_hash and verify_pin(request.pin, parent.pin_hash):
+        if needs_rehash(parent.pin_hash):
+            parent.pin_hash = hash_pin(request.pin)
+            db.commit()
         return {"valid": True, "message": "PIN verified"}
 
-    # Legacy plaintext PIN — verify and migrate to bcrypt
-    if parent.pin and parent.pin == request.pin:
+    # Legacy plaintext PIN — verify and migrate to a hash
+    if parent.has_legacy_pin and parent.pin == request.pin:
         parent.pin_hash = hash_pin(request.pin)
         parent.pin = None  # Remove plaintext
         db.commit()
@@ -7,7 +7,7 @@ from sqlalchemy.orm import Session
 
 logger = logging.getLogger(__name__)
 
-from ..database import get_db
+from ..database import get_db, json_contains
 from ..deps import require_auth, require_admin
 from ..models import Reward, RewardClaim, Kid, User, Parent
 from ..schemas import (
@@ -16,6 +16,7 @@ from ..schemas import (
     MessageResponse
 )
 from ..services.email_service import email_service
+from .approvals import invalidate_pending_count
 
 router = APIRouter()
 
@@ -24,19 +25,18 @@ async def email_notify_parents_reward_redeemed(db: Session, kid_id: str, kid_nam
     """Email all parents associated with this kid when a reward is redeemed."""
     if not email_service.is_configured():
         return
-    parents = db.query(Parent).all()
+    parents = db.query(Parent).filter(json_contains(Parent.associated_kids, kid_id)).all()
     for parent in parents:
-        if kid_id in (parent.associated_kids or []):
-            if parent.user_id:
-                user = db.query(User).filter(User.id == parent.user_id).first()
-                if user and user.email:
-                    await email_service.send_reward_redeemed_email(
-                        to_email=user.email,
-                        parent_name=parent.name,
-                        kid_name=kid_name,
-                        reward_name=reward_name,
-                        points_spent=points_spent,
-                    )
+        if parent.user_id:
+            user = parent.user
+            if user and user.email:
+                await email_service.send_reward_redeemed_email(
+                    to_email=user.email,
+                    parent_name=parent.name,
+                    kid_name=kid_name,
+                    reward_name=reward_name,
+                    points_spent=points_spent,
+                )
 
 
 @router.get("", response_model=List[RewardResponse])
@@ -132,6 +132,7 @@ def redeem_reward(reward_id: str, request: RewardRedeemRequest, background_tasks
 
     db.add(claim)
     db.commit()
+    invalidate_pending_count()
     db.refresh(claim)
 
     # Send email notification to parents (in background)
@@ -158,7 +159,7 @@ def approve_reward(reward_id: str, request: RewardApproveRequest, db: Session =
     # Derive parent_name from JWT if not provided
     parent_name = request.parent_name
     if not parent_name:
-        parent = db.query(Parent).filter(Parent.user_id == admin.id).first()
+        parent = admin.parent
         parent_name = parent.name if parent else (admin.display_name or admin.email)
 
     # Deduct points
@@ -170,6 +171,7 @@ def approve_reward(reward_id: str, request: RewardApproveRequest, db: Session =
     claim.approved_by = parent_name
 
     db.commit()
+    invalidate_pending_count()
     db.refresh(claim)
     return claim
 
@@ -188,7 +190,7 @@ def disapprove_reward(reward_id: str, request: RewardApproveRequest, db: Session
     # Derive parent_name from JWT if not provided
     parent_name = request.parent_name
     if not parent_name:
-        parent = db.query(Parent).filter(Parent.user_id == admin.id).first()
+        parent = admin.parent
         parent_name = parent.name if parent else (admin.display_name or admin.email)
 
     claim.status = "disapproved"
@@ -196,4 +198,5 @@ def disapprove_reward(reward_id: str, request: RewardApproveRequest, db: Session
     claim.approved_by = parent_name
 
     db.commit()
+    invalidate_pending_count()
     return {"message": "Reward disapproved"}
@@ -13,6 +13,8 @@ from ..models import (
     Badge, Bonus, Penalty, DailyMultiplier, ScheduledJobLog,
     PushSubscription, NotificationPreference,
 )
+from .allowance import invalidate_allowance_settings
+from .approvals import invalidate_pending_count
 
 router = APIRouter()
 
@@ -66,6 +68,8 @@ def reset_database(db: Session = Depends(get_db)):
         db.query(ScheduledJobLog).delete()
 
         db.commit()
+        invalidate_pending_count()
+        invalidate_allowance_settings()
 
         return {"status": "reset complete", "message": "All entity data cleared (users preserved)"}
 
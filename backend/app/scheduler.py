@@ -52,6 +52,10 @@ async def setup_scheduled_jobs(scheduler: AsyncIOScheduler):
     from app.jobs.chore_reset import reset_recurring_chores
     from app.jobs.streak_calculation import calculate_daily_streaks
     from app.jobs.daily_summary import send_daily_summary_emails
+    from app.services.timestamp_flusher import last_login_flusher, last_used_flusher
+    from app.jobs.job_log import prune_job_logs
+    from app.database import checkpoint_wal, optimize_db
+    from app.config import settings
 
     # Midnight chore reset - runs at 00:01 every day
     scheduler.add_job(
@@ -86,6 +90,57 @@ async def setup_scheduled_jobs(scheduler: AsyncIOScheduler):
         replace_existing=True
     )
 
+    # Job log retention - runs at 03:00 every day
+    scheduler.add_job(
+        prune_job_logs,
+        'cron',
+        hour=3,
+        minute=0,
+        id='prune_job_logs',
+        name='Prune Scheduled Job Logs',
+        replace_existing=True
+    )
+
+    # API token last_used stamps - flushed in one batch (every 30 seconds by default)
+    scheduler.add_job(
+        last_used_flusher.flush,
+        'interval',
+        seconds=settings.api_token_last_used_flush_seconds,
+        id='flush_api_token_last_used',
+        name='Flush API Token Last Used',
+        replace_existing=True
+    )
+
+    # User last_login stamps - same batching, kept off the login path
+    scheduler.add_job(
+        last_login_flusher.flush,
+        'interval',
+        seconds=settings.last_login_flush_seconds,
+        id='flush_user_last_login',
+        name='Flush User Last Login',
+        replace_existing=True
+    )
+
+    # WAL checkpoint - truncates the SQLite write-ahead log every 10 minutes
+    scheduler.add_job(
+        checkpoint_wal,
+        'interval',
+        minutes=10,
+        id='checkpoint_wal',
+        name='Checkpoint SQLite WAL',
+        replace_existing=True
+    )
+
+    # Planner statistics refresh - hourly PRAGMA optimize
+    scheduler.add_job(
+        optimize_db,
+        'interval',
+        hours=1,
+        id='optimize_db',
+        name='Optimize SQLite Statistics',
+        replace_existing=True
+    )
+
     logger.info("Scheduled jobs registered successfully")
 
 
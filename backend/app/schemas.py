@@ -1,7 +1,30 @@
 """Pydantic schemas for request/response validation."""
 from datetime import datetime
-from typing import List, Optional
-from pydantic import BaseModel, EmailStr
+from functools import lru_cache
+from typing import Annotated, List, Optional
+from pydantic import AfterValidator, BaseModel, EmailStr, WithJsonSchema, field_validator
+from pydantic.networks import validate_email
+
+
+def normalize_email(value: str) -> str:
+    """Canonical form of an email address; users.email is stored this way."""
+    return value.strip().lower()
+
+
+@lru_cache(maxsize=4096)
+def _validate_login_email(value: str) -> str:
+    # Same syntax-only check as EmailStr (no DNS lookup), memoized so repeat
+    # logins from the same address skip email-validator entirely
+    return normalize_email(validate_email(value)[1])
+
+
+# EmailStr for the auth hot path: validated once per distinct address and
+# returned in normalized form
+LoginEmail = Annotated[
+    str,
+    AfterValidator(_validate_login_email),
+    WithJsonSchema({"type": "string", "format": "email"}),
+]
 
 
 # --- Kid Schemas ---
@@ -493,6 +516,8 @@ class PasswordResetRequest(BaseModel):
     """Request to initiate password reset."""
     email: str
 
+    _normalize_email = field_validator("email")(normalize_email)
+
 
 class PasswordResetVerify(BaseModel):
     """Request to verify token and set new password."""
@@ -5,22 +5,35 @@ from datetime import datetime, timedelta, timezone
 from typing import Optional, Tuple
 
 import bcrypt
+from argon2 import PasswordHasher
+from argon2.exceptions import InvalidHashError, VerificationError
 from jose import JWTError, jwt
 
+from .cache import TTLCache
 from .config import settings
 
 
-# --- Password Hashing (bcrypt with SHA256 fallback for migration) ---
+# --- Password Hashing (Argon2id, with bcrypt and SHA256 fallbacks for migration) ---
+
+# Argon2id with OWASP's 46 MiB memory cost; still faster per verify than the
+# bcrypt rounds=12 it replaces
+_password_hasher = PasswordHasher(time_cost=3, memory_cost=46 * 1024, parallelism=1)
+
 
 def hash_password(password: str) -> str:
-    """Hash a password using bcrypt."""
-    return bcrypt.hashpw(password.encode(), bcrypt.gensalt(rounds=12)).decode()
+    """Hash a password using Argon2id."""
+    return _password_hasher.hash(password)
 
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
-    """Verify a password against its hash. Supports bcrypt and legacy SHA256."""
-    if hashed_password.startswith("$2b$") or hashed_password.startswith("$2a$"):
-        # bcrypt hash
+    """Verify a password against its hash. Supports Argon2id, bcrypt and legacy SHA256."""
+    if hashed_password.startswith("$argon2"):
+        try:
+            return _password_hasher.verify(hashed_password, plain_password)
+        except (VerificationError, InvalidHashError):
+            return False
+    elif hashed_password.startswith("$2b$") or hashed_password.startswith("$2a$"):
+        # bcrypt hash (pre-Argon2)
         return bcrypt.checkpw(plain_password.encode(), hashed_password.encode())
     elif "$" in hashed_password:
         # Legacy SHA256+salt format: {salt}${hash}
@@ -31,14 +44,16 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
 
 
 def needs_rehash(hashed_password: str) -> bool:
-    """Check if a password hash needs upgrading from SHA256 to bcrypt."""
-    return not (hashed_password.startswith("$2b$") or hashed_password.startswith("$2a$"))
+    """Check if a hash should be upgraded: bcrypt/SHA256, or Argon2 with old parameters."""
+    if not hashed_password.startswith("$argon2"):
+        return True
+    return _password_hasher.check_needs_rehash(hashed_password)
 
 
 # --- PIN Hashing ---
 
 def hash_pin(pin: str) -> str:
-    """Hash a PIN using bcrypt."""
+    """Hash a PIN (same scheme as passwords)."""
     return hash_password(pin)
 
 
@@ -77,18 +92,33 @@ def create_refresh_token(
     return jwt.encode(to_encode, settings.jwt_secret_key, algorithm=settings.jwt_algorithm)
 
 
+# Decoded payloads keyed by token digest; entries never outlive the token's exp
+_decoded_tokens = TTLCache(maxsize=4096, ttl=300)
+
+
 def decode_token(token: str) -> Optional[dict]:
     """Decode and validate a JWT token."""
+    cache_key = hashlib.blake2b(token.encode(), digest_size=16).digest()
+    payload = _decoded_tokens.get(cache_key)
+    if payload is not None:
+        return payload
+
     try:
         payload = jwt.decode(
             token,
             settings.jwt_secret_key,
             algorithms=[settings.jwt_algorithm]
         )
-        return payload
     except JWTError:
         return None
 
+    exp = payload.get("exp")
+    if exp is not None:
+        remaining = exp - datetime.now(timezone.utc).timestamp()
+        if remaining > 0:
+            _decoded_tokens.set(cache_key, payload, ttl=min(remaining, _decoded_tokens.ttl))
+    return payload
+
 
 # --- API Tokens ---
 
@@ -99,13 +129,29 @@ def generate_api_token() -> Tuple[str, str]:
     """
     random_part = secrets.token_urlsafe(32)
     full_token = f"{settings.api_token_prefix}{random_part}"
-    token_hash = hash_password(full_token)
+    token_hash = hash_api_token(full_token)
     return full_token, token_hash
 
 
+def hash_api_token(token: str) -> str:
+    """SHA256 hex digest of an API token.
+
+    Tokens carry 256 bits of randomness, so an unsalted fast hash is as hard to
+    invert as guessing the token, and it can be looked up by equality.
+    """
+    return hashlib.sha256(token.encode()).hexdigest()
+
+
+def is_legacy_api_token_hash(token_hash: str) -> bool:
+    """Whether a stored hash predates SHA256 token hashing (bcrypt)."""
+    return token_hash.startswith("$2")
+
+
 def verify_api_token(plain_token: str, hashed_token: str) -> bool:
-    """Verify an API token against its hash."""
-    return verify_password(plain_token, hashed_token)
+    """Verify an API token against its hash (SHA256, or bcrypt for older tokens)."""
+    if is_legacy_api_token_hash(hashed_token):
+        return verify_password(plain_token, hashed_token)
+    return secrets.compare_digest(hash_api_token(plain_token), hashed_token)
 
 
 def get_token_prefix(token: str) -> str:
@@ -115,16 +161,15 @@ def get_token_prefix(token: str) -> str:
 
 # --- Password Reset Tokens ---
 
+def hash_reset_token(token: str) -> str:
+    """Hash a password reset token (SHA256; deterministic, so it can be looked up)."""
+    return hashlib.sha256(token.encode()).hexdigest()
+
+
 def generate_reset_token() -> Tuple[str, str]:
     """
     Generate a secure password reset token.
     Returns (plain_token, token_hash) - store hash, send plain token to user.
     """
     token = secrets.token_urlsafe(48)
-    token_hash = hashlib.sha256(token.encode()).hexdigest()
-    return token, token_hash
-
-
-def verify_reset_token(plain_token: str, token_hash: str) -> bool:
-    """Verify a password reset token against its stored hash."""
-    return hashlib.sha256(plain_token.encode()).hexdigest() == token_hash
+    return token, hash_reset_token(token)
@@ -0,0 +1,64 @@
+"""Coalesces row timestamps (API token last_used, user last_login) into batch UPDATEs."""
+import logging
+import threading
+from datetime import datetime, timezone
+
+from sqlalchemy import Column, bindparam, update
+
+from ..database import SessionLocal
+from ..models import ApiToken, User
+
+logger = logging.getLogger(__name__)
+
+
+class TimestampFlusher:
+    """Buffers timestamps for one column so the request path never commits."""
+
+    def __init__(self, column: Column):
+        self._column = column
+        self._pending: dict[str, datetime] = {}
+        self._lock = threading.Lock()
+
+    def record(self, row_id: str) -> None:
+        """Note that the row was just touched."""
+        with self._lock:
+            self._pending[row_id] = datetime.now(timezone.utc)
+
+    def _requeue(self, pending: dict[str, datetime]) -> None:
+        """Put unwritten stamps back for the next flush, keeping the newer per row."""
+        with self._lock:
+            for row_id, ts in pending.items():
+                current = self._pending.get(row_id)
+                if current is None or ts > current:
+                    self._pending[row_id] = ts
+
+    def flush(self) -> int:
+        """Write all buffered timestamps in one executemany UPDATE."""
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        if not pending:
+            return 0
+
+        table = self._column.table
+        stmt = (
+            update(table)
+            .where(table.c.id == bindparam("row_id"))
+            .values({self._column.name: bindparam("ts")})
+        )
+        db = SessionLocal()
+        try:
+            db.execute(stmt, [{"row_id": row_id, "ts": ts} for row_id, ts in pending.items()])
+            db.commit()
+        except Exception as e:
+            db.rollback()
+            logger.error(f"Failed to flush {table.name}.{self._column.name}: {e}")
+            self._requeue(pending)
+            return 0
+        finally:
+            db.close()
+        return len(pending)
+
+
+# Singleton instances
+last_used_flusher = TimestampFlusher(ApiToken.__table__.c.last_used)
+last_login_flusher = TimestampFlusher(User.__table__.c.last_login)